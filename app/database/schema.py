@@ -93,10 +93,17 @@ class PropertyDB:
         Initialize PropertyDB connection.
         
         Args:
-            db_path: Path to DuckDB database file
+            db_path: Path to DuckDB database file, or ":memory:" for an
+                in-memory database (no file, no WAL)
         """
         self.db_path = db_path
         
+        if db_path == ":memory:":
+            self.conn = duckdb.connect(":memory:")
+            create_property_schema(self.conn)
+            logger.info("PropertyDB initialized in memory")
+            return
+        
         try:
             # Ensure data directory exists
             Path(db_path).parent.mkdir(parents=True, exist_ok=True)
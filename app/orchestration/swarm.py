@@ -6,7 +6,8 @@ Integração PydanticAI + LangGraph para respostas dinâmicas.
 Fallback inteligente com Ollama para funcionar sem chaves de API.
 """
 
-from typing import Dict, Any, List, Optional, AsyncIterator, Literal
+from collections import deque
+from typing import Dict, Any, List, Optional, AsyncIterator, Literal, Annotated, Deque, Iterable, NamedTuple, Union
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.types import Command
@@ -130,6 +131,46 @@ async def create_pydantic_agent(agent_name: str, model_name: str = "mistralai/mi
             raise
 
 
+HANDOFF_HISTORY_MAXLEN = 128
+
+
+class Handoff(NamedTuple):
+    """Registro imutável de um handoff entre agentes."""
+    
+    from_agent: str
+    to_agent: str
+    ts: float
+
+
+def _as_handoff(entry: Union[Handoff, Dict[str, Any]]) -> Handoff:
+    """Converte entradas legadas ({"from", "to"[, "ts"]}) em Handoff."""
+    if isinstance(entry, Handoff):
+        return entry
+    return Handoff(entry["from"], entry["to"], float(entry.get("ts", 0.0)))
+
+
+def append_handoffs(
+    left: Optional[Iterable[Union[Handoff, Dict[str, Any]]]],
+    right: Union[Handoff, Dict[str, Any], Iterable[Union[Handoff, Dict[str, Any]]], None]
+) -> Deque[Handoff]:
+    """
+    Reducer append-only do histórico de handoffs.
+    
+    Reducers do LangGraph devem ser puros: o estado anterior (left) pode
+    estar em um checkpoint, então nunca é modificado. Retorna um novo deque
+    limitado a HANDOFF_HISTORY_MAXLEN eventos com os handoffs de right
+    anexados. Aceita também entradas legadas em dict.
+    """
+    merged: Deque[Handoff] = deque(map(_as_handoff, left or ()), maxlen=HANDOFF_HISTORY_MAXLEN)
+    
+    if isinstance(right, (Handoff, dict)):
+        merged.append(_as_handoff(right))
+    elif right:
+        merged.extend(map(_as_handoff, right))
+    
+    return merged
+
+
 class SwarmState(MessagesState):
     """Estado global do swarm com contexto compartilhado."""
     
@@ -151,7 +192,9 @@ class SwarmState(MessagesState):
     
     # Contexto de handoffs
     current_agent: str = Field(default="search_agent")
-    handoff_history: List[Dict[str, Any]] = Field(default_factory=list)
+    handoff_history: Annotated[Deque[Handoff], append_handoffs] = Field(
+        default_factory=lambda: deque(maxlen=HANDOFF_HISTORY_MAXLEN)
+    )
     context: Dict[str, Any] = Field(default_factory=dict)
 
 
@@ -162,7 +205,7 @@ async def search_agent_node(state: SwarmState) -> dict:
     # Instrumentação dupla: Logfire + LangSmith para rastreamento completo
     with AgentExecutionContext("search_agent", "property_search") as logfire_span, \
          LangGraphExecutionContext("swarm_graph", "search_agent", dict(state)) as langsmith_span:
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # 🔥 CORREÇÃO: Acessar mensagens corretamente no LangGraph
         messages = state.messages if hasattr(state, 'messages') else state.get("messages", [])
@@ -315,7 +358,7 @@ Respond now as Alex, using the available property information to help with their
             
             # Enhanced Logfire tracing for LLM call
             with AgentExecutionContext("search_agent", "llm_inference") as llm_span:
-                llm_start = time.time()
+                llm_start = time.perf_counter()
                 try:
                     logger.info(f"DEBUG: About to call agent.run() with prompt length: {len(prompt)}")
                     
@@ -328,7 +371,7 @@ Respond now as Alex, using the available property information to help with their
                         })
                     
                     response = await agent.run(prompt)
-                    llm_duration = time.time() - llm_start
+                    llm_duration = time.perf_counter() - llm_start
                     logger.info(f"SUCCESS Primary model {primary_model} successful in {llm_duration:.2f}s")
                     
                     if llm_span:
@@ -338,7 +381,7 @@ Respond now as Alex, using the available property information to help with their
                             "llm.response_length": len(str(response.output)) if response.output else 0
                         })
                 except Exception as primary_error:
-                    llm_duration = time.time() - llm_start
+                    llm_duration = time.perf_counter() - llm_start
                     error_msg = str(primary_error)
                     logger.error(f"ERROR Primary model {primary_model} failed after {llm_duration:.2f}s: {error_msg}")
                     
@@ -383,7 +426,7 @@ Respond now as Alex, using the available property information to help with their
                             })
                         
                         response = await fallback_agent.run(prompt)
-                        llm_duration = time.time() - llm_start
+                        llm_duration = time.perf_counter() - llm_start
                         logger.info(f"SUCCESS Fallback model {fallback_model} successful in {llm_duration:.2f}s")
                         
                         if fallback_span:
@@ -420,7 +463,7 @@ Respond helpfully about property search in 2-3 sentences. Be friendly and ask wh
                     logger.info(f"SUCCESS Search retry successful: {len(response_content)} chars")
             
             # Log da resposta bem-sucedida
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             log_agent_action(
                 agent_name="search_agent",
                 action="llm_response_success",
@@ -607,12 +650,12 @@ Respond now as Emma, using the property information provided above to answer the
             agent = await create_pydantic_agent("property_agent", "mistralai/mistral-7b-instruct:free")
             
             # Execute the analysis
-            llm_start = time.time()
+            llm_start = time.perf_counter()
             logger.info(f"DEBUG: About to call property agent with prompt length: {len(prompt)}")
             
             try:
                 response = await agent.run(prompt)
-                llm_duration = time.time() - llm_start
+                llm_duration = time.perf_counter() - llm_start
                 logger.info(f"SUCCESS Property agent successful in {llm_duration:.2f}s")
                 
                 content = str(response.output)
@@ -650,7 +693,7 @@ Respond helpfully in 2-3 sentences."""
                 return {"messages": [AIMessage(content=content)]}
                 
             except Exception as primary_error:
-                llm_duration = time.time() - llm_start
+                llm_duration = time.perf_counter() - llm_start
                 error_msg = str(primary_error)
                 logger.error(f"ERROR Property agent failed after {llm_duration:.2f}s: {error_msg}")
                 
@@ -667,7 +710,7 @@ Respond helpfully in 2-3 sentences."""
                     fallback_agent = await create_pydantic_agent("property_agent_fallback", "mistralai/mistral-7b-instruct:free")
                     response = await fallback_agent.run(prompt)
                     content = str(response.output)
-                    llm_duration = time.time() - llm_start
+                    llm_duration = time.perf_counter() - llm_start
                     logger.info(f"SUCCESS Property agent fallback successful in {llm_duration:.2f}s")
                     return {"messages": [AIMessage(content=content)]}
                 except Exception as fallback_error:
@@ -795,12 +838,12 @@ Respond now as Mike, helping them schedule their property viewing professionally
             agent = await create_pydantic_agent("scheduling_agent", "mistralai/mistral-7b-instruct:free")
             
             # Execute the scheduling analysis
-            llm_start = time.time()
+            llm_start = time.perf_counter()
             logger.info(f"DEBUG: About to call scheduling agent with prompt length: {len(prompt)}")
             
             try:
                 response = await agent.run(prompt)
-                llm_duration = time.time() - llm_start
+                llm_duration = time.perf_counter() - llm_start
                 logger.info(f"SUCCESS Scheduling agent successful in {llm_duration:.2f}s")
                 
                 content = str(response.output)
@@ -837,7 +880,7 @@ Suggest 2-3 viewing times and ask what works best for them."""
                 return {"messages": [AIMessage(content=content)]}
                 
             except Exception as primary_error:
-                llm_duration = time.time() - llm_start
+                llm_duration = time.perf_counter() - llm_start
                 error_msg = str(primary_error)
                 logger.error(f"ERROR Scheduling agent failed after {llm_duration:.2f}s: {error_msg}")
                 
@@ -854,7 +897,7 @@ Suggest 2-3 viewing times and ask what works best for them."""
                 
                 response = await fallback_agent.run(prompt)
                 content = str(response.output)
-                llm_duration = time.time() - llm_start
+                llm_duration = time.perf_counter() - llm_start
                 logger.info(f"SUCCESS Scheduling agent fallback successful in {llm_duration:.2f}s")
                 
                 return {"messages": [AIMessage(content=content)]}
@@ -870,11 +913,17 @@ Suggest 2-3 viewing times and ask what works best for them."""
         return {"messages": [AIMessage(content=fallback_response)]}
 
 
+# Nós de agente aceitos como destino direto do roteador
+_AGENT_NODES = frozenset({"search_agent", "property_agent", "scheduling_agent"})
+
+
 def route_message(state: SwarmState) -> Literal["search_agent", "property_agent", "scheduling_agent", END]:
     """
     Roteador inteligente baseado no contexto e histórico com Logfire tracing.
     
-    Determina qual agente deve processar a próxima mensagem.
+    Determina qual agente deve processar a próxima mensagem. Se o contexto traz
+    direct_routing=True e a mensagem já define current_agent, a detecção de
+    intenção é pulada e o agente indicado é usado diretamente.
     """
     # Logfire tracing for routing decisions
     with HandoffContext("router", "routing_decision", "message_analysis") as route_span:
@@ -890,6 +939,23 @@ def route_message(state: SwarmState) -> Literal["search_agent", "property_agent"
                 "router.has_property_context": bool(context.get("property_context"))
             })
         
+        # Fast path: agente escolhido explicitamente pelo chamador (ex.: testes de debug)
+        if context.get("direct_routing") and current_agent in _AGENT_NODES:
+            if route_span:
+                route_span.set_attributes({
+                    "router.decision": current_agent,
+                    "router.reason": "direct_routing"
+                })
+            
+            log_handoff(
+                from_agent="router",
+                to_agent=current_agent,
+                reason="direct_routing",
+                context={"source": context.get("source")}
+            )
+            
+            return current_agent
+        
         # Se não há mensagens, começar com property_agent se temos contexto de propriedade
         if not messages:
             target_agent = "property_agent" if context.get("property_context") else "search_agent"
@@ -1172,7 +1238,7 @@ class SwarmOrchestrator:
         Returns:
             Resposta processada pelo swarm
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             self.logger.info(f"AGENT Processing message with intelligent agents: {message}")
@@ -1193,16 +1259,14 @@ class SwarmOrchestrator:
                 result = await self.graph.ainvoke(message, default_config)
             
             # Calcular tempo de execução
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             log_performance("swarm_message_processing", execution_time)
             
             self.logger.info(f"SUCCESS SwarmOrchestrator completed in {execution_time:.2f}s")
             return result
             
         except Exception as e:
-            self.logger.error(f"ERROR Error processing message: {e}")
-            import traceback
-            self.logger.error(f"Full traceback: {traceback.format_exc()}")
+            self.logger.exception("ERROR Error processing message: %s", e)
             raise
     
     async def process_stream(self, message: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
@@ -1227,9 +1291,7 @@ class SwarmOrchestrator:
             self.logger.info(f"SUCCESS Streaming completed - {chunk_count} chunks generated")
                 
         except Exception as e:
-            self.logger.error(f"Error in streaming: {e}")
-            import traceback
-            self.logger.error(f"Traceback: {traceback.format_exc()}")
+            self.logger.exception("Error in streaming: %s", e)
             yield {"error": str(e)}
     
     def get_graph_visualization(self) -> str:
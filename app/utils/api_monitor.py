@@ -79,9 +79,17 @@ class APIUsageMonitor:
     
     def get_warning_message(self) -> str:
         """Retorna mensagem de aviso baseada no uso atual."""
+        return self._warning_for(self.usage_data["rentcast"]["total_calls"])
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna uso da RentCast e mensagem de aviso em uma única chamada."""
         usage = self.get_rentcast_usage()
-        total = usage["total_used"]
-        
+        usage["warning"] = self._warning_for(usage["total_used"])
+        return usage
+    
+    @staticmethod
+    def _warning_for(total: int) -> str:
+        """Mensagem de aviso para um total de calls usadas."""
         if total >= 45:
             return f"🚨 CRÍTICO: {total}/50 calls usadas! Usar apenas para testes finais!"
         elif total >= 25:
@@ -5,21 +5,35 @@ This module provides real-time datetime context for AI agents to understand
 temporal references like "today", "tomorrow", "next week", etc.
 """
 
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any
 import pytz
 
 
+def _current_minute() -> int:
+    """Bucket do minuto atual: o contexto só muda quando muda o HH:MM."""
+    return int(time.time() // 60)
+
+
 def get_agent_datetime_context(timezone: str = "America/Sao_Paulo") -> Dict[str, Any]:
     """
     Generate comprehensive datetime context for agents.
     
+    The result is cached per minute and shared between callers; do not mutate it.
+    
     Args:
         timezone: Target timezone for datetime calculations
         
     Returns:
         Dictionary containing current datetime context and relative date mappings
     """
+    return _agent_datetime_context(timezone, _current_minute())
+
+
+@lru_cache(maxsize=8)
+def _agent_datetime_context(timezone: str, minute: int) -> Dict[str, Any]:
     try:
         tz = pytz.timezone(timezone)
     except pytz.UnknownTimeZoneError:
@@ -94,6 +108,11 @@ def format_datetime_context_for_agent() -> str:
     Returns:
         Formatted string with current datetime context
     """
+    return _format_datetime_context(_current_minute())
+
+
+@lru_cache(maxsize=2)
+def _format_datetime_context(minute: int) -> str:
     context = get_agent_datetime_context()
     current = context["current_datetime"]
     relative = context["formatted_relative_dates"]
@@ -128,6 +147,11 @@ def get_scheduling_context_for_agent() -> str:
     Returns:
         Formatted string with scheduling-specific datetime context
     """
+    return _scheduling_context(_current_minute())
+
+
+@lru_cache(maxsize=2)
+def _scheduling_context(minute: int) -> str:
     context = get_agent_datetime_context()
     current = context["current_datetime"]
     relative = context["relative_dates"]
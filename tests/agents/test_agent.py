@@ -3,23 +3,35 @@
 Teste do sistema agêntico real
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import pytest
 
-def test_agentic_system():
-    """Testa o sistema agêntico real"""
+API_BASE_URL = "http://localhost:8000"
+
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
+async def test_agentic_system(client):
+    """Sessão e chat do agente real devem responder com sucesso"""
+    assert await run_agentic_system(client)
+
+async def run_agentic_system(client: httpx.AsyncClient):
+    """Testa o sistema agêntico real
+    
+    Sessão, chat e agendamento são sequenciais, pois compartilham o histórico da sessão.
+    """
     
     print("🚀 Testando Sistema Agêntico Real")
     print("=" * 50)
     
     # 1. Start agent session
     print("\n1. Iniciando sessão do agente...")
-    session_resp = requests.post('http://localhost:8000/api/agent/session/start?mode=real', 
+    session_resp = await client.post('/api/agent/session/start?mode=real', 
         json={'property_id': '1', 'mode': 'details'})
     
-    if not session_resp.ok:
+    if not session_resp.is_success:
         print(f"❌ Erro ao iniciar sessão: {session_resp.text}")
-        return
+        return False
     
     session_data = session_resp.json()
     print(f"✅ Sessão criada: {session_data}")
@@ -28,12 +40,12 @@ def test_agentic_system():
     
     # 2. Send message to agent
     print(f"\n2. Enviando mensagem para o agente (session: {session_id})...")
-    chat_resp = requests.post('http://localhost:8000/api/agent/chat?mode=real',
+    chat_resp = await client.post('/api/agent/chat?mode=real',
         json={'message': 'What are the exact monthly costs?', 'session_id': session_id})
     
-    if not chat_resp.ok:
+    if not chat_resp.is_success:
         print(f"❌ Erro no chat: {chat_resp.text}")
-        return
+        return False
     
     chat_data = chat_resp.json()
     print(f"✅ Resposta do agente:")
@@ -42,16 +54,21 @@ def test_agentic_system():
     
     # 3. Test scheduling
     print(f"\n3. Testando agendamento...")
-    schedule_resp = requests.post('http://localhost:8000/api/agent/chat?mode=real',
+    schedule_resp = await client.post('/api/agent/chat?mode=real',
         json={'message': 'I want to schedule a visit', 'session_id': session_id})
     
-    if schedule_resp.ok:
+    if schedule_resp.is_success:
         schedule_data = schedule_resp.json()
         print(f"✅ Resposta de agendamento:")
         print(f"Agent: {schedule_data['data']['agent_name']}")
         print(f"Message: {schedule_data['data']['message'][:200]}...")
     
     print("\n🎉 Teste concluído!")
+    return True
+
+async def main():
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=30.0) as client:
+        await run_agentic_system(client)
 
 if __name__ == "__main__":
-    test_agentic_system() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
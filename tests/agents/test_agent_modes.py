@@ -3,10 +3,36 @@
 Teste do sistema agêntico com diferentes modos de dados
 """
 
-import requests
-import json
+import asyncio
+import re
+import httpx
+import pytest
 
-def test_agent_with_mode(mode: str):
+API_BASE_URL = "http://localhost:8000"
+
+# Frases das antigas respostas automáticas, compiladas numa única alternação
+OLD_AUTOMATIC_PHRASES = [
+    "Monthly Rent: $2,500",
+    "Security Deposit: $2,500 (1 month)",
+    "Great question about pricing!",
+    "Sarah - Property Expert"
+]
+_OLD_AUTOMATIC_RE = re.compile("|".join(map(re.escape, OLD_AUTOMATIC_PHRASES)))
+
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("mode", ["mock", "real"])
+async def test_agent_with_mode(client, mode):
+    """Sessão, chat de custos e agendamento devem funcionar em cada modo"""
+    assert await run_agent_with_mode(client, mode)
+
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
+async def test_demo_mode_agentic(client):
+    """Modo Demo não deve usar as respostas automáticas antigas"""
+    assert await check_demo_mode_agentic(client)
+
+async def run_agent_with_mode(client: httpx.AsyncClient, mode: str):
     """Testa o sistema agêntico com um modo específico"""
     
     print(f"\n🧪 Testando Sistema Agêntico - Modo: {mode.upper()}")
@@ -14,12 +40,12 @@ def test_agent_with_mode(mode: str):
     
     # 1. Start agent session
     print(f"\n1. Iniciando sessão do agente em modo {mode}...")
-    session_resp = requests.post(f'http://localhost:8000/api/agent/session/start?mode={mode}', 
+    session_resp = await client.post(f'/api/agent/session/start?mode={mode}', 
         json={'property_id': '1', 'mode': 'details'})
     
-    if not session_resp.ok:
+    if not session_resp.is_success:
         print(f"❌ Erro ao iniciar sessão: {session_resp.text}")
-        return
+        return False
     
     session_data = session_resp.json()
     print(f"✅ Sessão criada em modo {mode}")
@@ -28,12 +54,12 @@ def test_agent_with_mode(mode: str):
     
     # 2. Send message about costs
     print(f"\n2. Perguntando sobre custos em modo {mode}...")
-    chat_resp = requests.post(f'http://localhost:8000/api/agent/chat?mode={mode}',
+    chat_resp = await client.post(f'/api/agent/chat?mode={mode}',
         json={'message': 'What are the exact monthly costs for this property?', 'session_id': session_id})
     
-    if not chat_resp.ok:
+    if not chat_resp.is_success:
         print(f"❌ Erro no chat: {chat_resp.text}")
-        return
+        return False
     
     chat_data = chat_resp.json()
     print(f"✅ Resposta do agente em modo {mode}:")
@@ -42,10 +68,10 @@ def test_agent_with_mode(mode: str):
     
     # 3. Send message about scheduling
     print(f"\n3. Perguntando sobre agendamento em modo {mode}...")
-    schedule_resp = requests.post(f'http://localhost:8000/api/agent/chat?mode={mode}',
+    schedule_resp = await client.post(f'/api/agent/chat?mode={mode}',
         json={'message': 'I want to schedule a visit to this property', 'session_id': session_id})
     
-    if schedule_resp.ok:
+    if schedule_resp.is_success:
         schedule_data = schedule_resp.json()
         print(f"✅ Resposta de agendamento em modo {mode}:")
         print(f"Agent: {schedule_data['data']['agent_name']}")
@@ -53,19 +79,21 @@ def test_agent_with_mode(mode: str):
     
     return True
 
-def main():
+async def main(client: httpx.AsyncClient):
     """Função principal de teste"""
     print("🚀 Testando Sistema Agêntico com Diferentes Modos de Dados")
     print("=" * 80)
     
-    # Test both modes
+    # Test both modes - sessões independentes, executadas em paralelo
     modes = ["mock", "real"]
     
-    for mode in modes:
-        try:
-            test_agent_with_mode(mode)
-        except Exception as e:
-            print(f"❌ Erro no teste do modo {mode}: {e}")
+    results = await asyncio.gather(
+        *(run_agent_with_mode(client, mode) for mode in modes),
+        return_exceptions=True
+    )
+    for mode, result in zip(modes, results):
+        if isinstance(result, Exception):
+            print(f"❌ Erro no teste do modo {mode}: {result}")
     
     print("\n🎉 Testes concluídos!")
     print("\n📝 Verificar se:")
@@ -73,7 +101,7 @@ def main():
     print("- Modo REAL usa dados americanos/RentCast")
     print("- Ambos usam o sistema agêntico LangGraph-Swarm")
 
-def test_demo_mode_agentic():
+async def check_demo_mode_agentic(client: httpx.AsyncClient):
     """Testa se o modo Demo está usando sistema agêntico real"""
     
     print("🧪 TESTE: Modo Demo com Sistema Agêntico")
@@ -89,8 +117,8 @@ def test_demo_mode_agentic():
             "language": "en"
         }
         
-        session_response = requests.post(
-            "http://localhost:8000/api/agent/session/start?mode=mock",
+        session_response = await client.post(
+            "/api/agent/session/start?mode=mock",
             json=session_data,
             timeout=10
         )
@@ -100,7 +128,7 @@ def test_demo_mode_agentic():
         
         if not session_result.get('success'):
             print(f"❌ Falha ao criar sessão: {session_result.get('message')}")
-            return
+            return False
             
         session_id = session_result['data']['session']['session_id']
         print(f"✅ 1. Sessão Demo criada: {session_id}")
@@ -112,8 +140,8 @@ def test_demo_mode_agentic():
             "session_id": session_id
         }
         
-        message_response = requests.post(
-            "http://localhost:8000/api/agent/chat?mode=mock",
+        message_response = await client.post(
+            "/api/agent/chat?mode=mock",
             json=message_data,
             timeout=30
         )
@@ -123,7 +151,7 @@ def test_demo_mode_agentic():
         
         if not message_result.get('success'):
             print(f"❌ Falha ao enviar mensagem: {message_result.get('message')}")
-            return
+            return False
             
         agent_response = message_result['data']
         
@@ -136,14 +164,7 @@ def test_demo_mode_agentic():
         message_content = agent_response.get('message', '')
         
         # Verificar se NÃO são as mensagens automáticas antigas
-        old_automatic_phrases = [
-            "Monthly Rent: $2,500",
-            "Security Deposit: $2,500 (1 month)",
-            "Great question about pricing!",
-            "Sarah - Property Expert"
-        ]
-        
-        is_old_automatic = any(phrase in message_content for phrase in old_automatic_phrases)
+        is_old_automatic = bool(_OLD_AUTOMATIC_RE.search(message_content))
         
         if is_old_automatic:
             print(f"❌ PROBLEMA: Ainda usando mensagens automáticas antigas!")
@@ -160,10 +181,14 @@ def test_demo_mode_agentic():
         print(f"❌ Erro no teste: {e}")
         return False
 
+async def run_all():
+    """Executa os testes de modos e do modo Demo com um único cliente HTTP"""
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=30.0) as client:
+        await main(client)
+        return await check_demo_mode_agentic(client)
+
 if __name__ == "__main__":
-    main()
-    
-    success = test_demo_mode_agentic()
+    success = asyncio.run(run_all())
     
     if success:
         print(f"\n🎉 MODO DEMO FUNCIONANDO COM SISTEMA AGÊNTICO!")
@@ -4,6 +4,7 @@ Teste do sistema agêntico com ID de propriedade real
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 
 def test_with_real_property_id():
     print('🧪 Testando com ID de propriedade real')
@@ -18,42 +19,46 @@ def test_with_real_property_id():
         ("real", real_property_id)
     ]
     
-    for mode, property_id in modes:
-        print(f'\n--- Testando modo {mode.upper()} com property_id: {property_id} ---')
+    # Uma única conexão keep-alive com o servidor local para todas as chamadas
+    with requests.Session() as s:
+        s.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
         
-        # Start session
-        session_resp = requests.post(f'http://localhost:8000/api/agent/session/start?mode={mode}', 
-            json={'property_id': property_id, 'mode': 'details'})
+        for mode, property_id in modes:
+            print(f'\n--- Testando modo {mode.upper()} com property_id: {property_id} ---')
         
-        if not session_resp.ok:
-            print(f'❌ Erro ao iniciar sessão: {session_resp.text}')
-            continue
+            # Start session
+            session_resp = s.post(f'http://localhost:8000/api/agent/session/start?mode={mode}', 
+                json={'property_id': property_id, 'mode': 'details'})
         
-        session_data = session_resp.json()
-        session_id = session_data['data']['session']['session_id']
-        print(f'✅ Sessão criada: {session_id}')
+            if not session_resp.ok:
+                print(f'❌ Erro ao iniciar sessão: {session_resp.text}')
+                continue
         
-        # Send message
-        chat_resp = requests.post(f'http://localhost:8000/api/agent/chat?mode={mode}',
-            json={'message': 'What are the exact monthly costs for this property?', 'session_id': session_id})
+            session_data = session_resp.json()
+            session_id = session_data['data']['session']['session_id']
+            print(f'✅ Sessão criada: {session_id}')
         
-        if chat_resp.ok:
-            chat_data = chat_resp.json()
-            print(f'Agent: {chat_data["data"]["agent_name"]}')
-            message = chat_data["data"]["message"]
-            print(f'Response preview: {message[:200]}...')
+            # Send message
+            chat_resp = s.post(f'http://localhost:8000/api/agent/chat?mode={mode}',
+                json={'message': 'What are the exact monthly costs for this property?', 'session_id': session_id})
+        
+            if chat_resp.ok:
+                chat_data = chat_resp.json()
+                print(f'Agent: {chat_data["data"]["agent_name"]}')
+                message = chat_data["data"]["message"]
+                print(f'Response preview: {message[:200]}...')
             
-            # Look for property-specific information
-            if "1050 Brickell" in message:
-                print('✅ Found Brickell property info (mock data)')
-            elif "1300 S Miami" in message:
-                print('✅ Found Miami Ave property info (real data)')
-            elif "Copacabana" in message:
-                print('❌ Still showing Brazilian data (incorrect)')
+                # Look for property-specific information
+                if "1050 Brickell" in message:
+                    print('✅ Found Brickell property info (mock data)')
+                elif "1300 S Miami" in message:
+                    print('✅ Found Miami Ave property info (real data)')
+                elif "Copacabana" in message:
+                    print('❌ Still showing Brazilian data (incorrect)')
+                else:
+                    print('? Unknown property data')
             else:
-                print('? Unknown property data')
-        else:
-            print(f'❌ Erro no chat: {chat_resp.text}')
+                print(f'❌ Erro no chat: {chat_resp.text}')
 
 if __name__ == "__main__":
     test_with_real_property_id() 
\ No newline at end of file
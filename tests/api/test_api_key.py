@@ -4,9 +4,62 @@ Test script to verify OpenRouter API key loading.
 """
 
 import asyncio
+import httpx
+import pytest
+import pytest_asyncio
 from config.settings import get_settings
 
-async def test_api_key_loading():
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+OPENROUTER_CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+def _new_client() -> httpx.AsyncClient:
+    """
+    Cliente HTTP reutilizado entre chamadas: evita um handshake TCP+TLS por requisição
+    e multiplexa requisições concorrentes sobre uma única conexão HTTP/2.
+    
+    Criado sob demanda (não na importação) e sempre fechado por quem o cria.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60),
+        timeout=30.0
+    )
+
+# Corpo da requisição de teste serializado uma única vez
+_API_TEST_BODY = _dumps({
+    "model": "mistralai/mistral-7b-instruct:free",
+    "messages": [{"role": "user", "content": "Hello, respond with 'API key working!'"}],
+    "temperature": 0.1,
+    "max_tokens": 20
+})
+
+@pytest.mark.unit
+def test_api_key_loading():
+    """API key must be loaded from settings."""
+    assert check_api_key_loading()
+
+@pytest_asyncio.fixture
+async def openrouter_client():
+    """Cliente OpenRouter do teste, no event loop do próprio teste."""
+    async with _new_client() as client:
+        yield client
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_direct_api_call(openrouter_client):
+    """A direct OpenRouter call must succeed with the loaded key."""
+    assert await check_direct_api_call(openrouter_client)
+
+def check_api_key_loading():
     """Test if API key is being loaded correctly."""
     
     print("Testing API key loading...")
@@ -36,15 +89,12 @@ async def test_api_key_loading():
         print(f"ERROR loading API key: {e}")
         return False
 
-async def test_direct_api_call():
+async def check_direct_api_call(client: httpx.AsyncClient):
     """Test a direct API call to verify the key works."""
     
     print("\nTesting direct API call...")
     
     try:
-        import httpx
-        from config.settings import get_settings
-        
         settings = get_settings()
         api_key = settings.apis.openrouter_key
         
@@ -52,35 +102,28 @@ async def test_direct_api_call():
             print("ERROR: No API key available for testing")
             return False
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "mistralai/mistral-7b-instruct:free",
-                    "messages": [{"role": "user", "content": "Hello, respond with 'API key working!'"}],
-                    "temperature": 0.1,
-                    "max_tokens": 20
-                },
-                timeout=30.0
-            )
-            
-            print(f"Response status: {response.status_code}")
+        response = await client.post(
+            OPENROUTER_CHAT_URL,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            content=_API_TEST_BODY
+        )
+        
+        print(f"Response status: {response.status_code}")
+        
+        if response.status_code == 200:
+            result = response.json()
+            content = result["choices"][0]["message"]["content"]
+            print(f"Response content: {content}")
+            print("SUCCESS: API key is working!")
+            return True
+        else:
+            print(f"ERROR: API call failed with status {response.status_code}")
+            print(f"Response: {response.text}")
+            return False
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-                print(f"Response content: {content}")
-                print("SUCCESS: API key is working!")
-                return True
-            else:
-                print(f"ERROR: API call failed with status {response.status_code}")
-                print(f"Response: {response.text}")
-                return False
-                
     except Exception as e:
         print(f"ERROR in API call: {e}")
         return False
@@ -92,11 +135,12 @@ async def main():
     print("=" * 50)
     
     # Test 1: Key loading
-    key_ok = await test_api_key_loading()
+    key_ok = check_api_key_loading()
     
     # Test 2: Direct API call (only if key loaded)
     if key_ok:
-        api_ok = await test_direct_api_call()
+        async with _new_client() as client:
+            api_ok = await check_direct_api_call(client)
     else:
         api_ok = False
         print("\nSkipping API call test - key loading failed")
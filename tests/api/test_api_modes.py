@@ -6,49 +6,88 @@ Permite alternar entre modo mock (seguro) e API real (1 uso controlado).
 """
 
 import asyncio
-from app.utils.logging import setup_logging
-from app.utils.container import DIContainer
-from app.utils.api_monitor import api_monitor
-from app.orchestration.swarm import SwarmOrchestrator
-from config.settings import get_settings
-from config.api_config import api_config, APIMode
+import logging
+import os
+import sys
+from typing import TYPE_CHECKING
 
+# Imports do app são feitos dentro das funções: qualquer import de "app"
+# constrói o pacote inteiro (swarm incluso), o que é caro para uso rápido.
+if TYPE_CHECKING:
+    from app.orchestration.swarm import SwarmOrchestrator
+    from config.api_config import APIMode
 
-async def test_mode(mode: str, use_real_api: bool = False):
-    """Testar sistema em modo específico."""
+_AGENTS = ("search_agent", "property_agent", "scheduling_agent")
+_AGENT_SET = frozenset(_AGENTS)
+_AGENT_ORDER = {name: i for i, name in enumerate(_AGENTS)}
+
+# Banners montados uma vez e escritos com um único write
+_HEADER_BANNER = "\n" + "=" * 70 + "\n🎯 TESTE DE MODOS DE API\n" + "=" * 70 + "\n"
+_REAL_API_BANNER = (
+    "\n" + "🔔" * 70 + "\n"
+    "⚠️  ATENÇÃO: TESTE COM API REAL\n"
+    + "🔔" * 70 + "\n"
+    "O teste real usará 1 call da sua API RentCast (49 restantes após o teste)\n"
+    "Para executar, defina RUN_REAL_API=SIM (não interativo, seguro para CI)\n"
+)
+_SUCCESS_SUMMARY = (
+    "🎉 TODOS OS TESTES PASSARAM!\n"
+    "✅ Sistema funcionando em ambos os modos\n"
+    "✅ API RentCast integrada e operacional\n"
+    "✅ Modo mock funciona corretamente\n"
+    "✅ Sistema pronto para produção"
+)
+_FAILURE_SUMMARY = (
+    "❌ ALGUNS TESTES FALHARAM\n"
+    "📋 Verificar logs acima para detalhes"
+)
+
+
+def _truncate(s: str, n: int = 200) -> str:
+    """Prévia de até n caracteres; só copia/adiciona '...' quando precisa cortar."""
+    return s if len(s) <= n else f"{s[:n]}..."
+
+
+def _write(text: str) -> None:
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+async def test_mode(orchestrator: "SwarmOrchestrator", mode: "APIMode", use_real_api: bool = False):
+    """Testar sistema em modo específico.
+    
+    O modo vai no contexto da mensagem (data_mode) em vez de alterar o
+    api_config global. As fases não devem rodar em paralelo: o uso da API é
+    medido pela diferença do contador global do api_monitor.
+    """
+    from app.utils.logging import setup_logging
+    from app.utils.api_monitor import api_monitor
+    from config.api_config import APIMode
     
     logger = setup_logging()
-    logger.info(f"🧪 TESTANDO MODO: {mode.upper()}")
+    
+    # Real sem use_real_api é só o modo mock: delega direto
+    if mode == APIMode.REAL and not use_real_api:
+        logger.warning("⚠️ Modo real configurado mas use_real_api=False (fallback para mock)")
+        return await test_mode(orchestrator, APIMode.MOCK)
+    
+    logger.info("🧪 TESTANDO MODO: %s", mode.value.upper())
     logger.info("=" * 60)
     
     # Configurar modo
-    if mode == "real":
-        api_config.mode = APIMode.REAL
-        api_config.use_real_api = use_real_api
+    if mode == APIMode.REAL:
         logger.info("🌐 Modo configurado: API REAL")
-        if not use_real_api:
-            logger.warning("⚠️ Modo real configurado mas use_real_api=False (fallback para mock)")
     else:
-        api_config.mode = APIMode.MOCK
-        api_config.use_real_api = False
         logger.info("📦 Modo configurado: MOCK")
     
     # Status da API
-    usage = api_monitor.get_rentcast_usage()
-    warning = api_monitor.get_warning_message()
-    logger.info(f"📊 Status API: {warning}")
-    
-    # Configurar sistema
-    settings = get_settings()
-    container = DIContainer()
+    pre = api_monitor.snapshot()
+    logger.info("📊 Status API: %s", pre["warning"])
     
     try:
-        await container.setup(settings)
-        orchestrator = container.get(SwarmOrchestrator)
-        
         # Query de teste
         query = "Quero um apartamento de 3 quartos em Ipanema até R$ 6000 reais"
-        logger.info(f"🏠 CONSULTA: {query}")
+        logger.info("🏠 CONSULTA: %s", query)
         logger.info("-" * 60)
         
         # Preparar mensagem
@@ -58,7 +97,8 @@ async def test_mode(mode: str, use_real_api: bool = False):
                     "role": "user",
                     "content": query
                 }
-            ]
+            ],
+            "context": {"data_mode": mode.value}
         }
         
         # Processar e capturar resposta
@@ -68,28 +108,30 @@ async def test_mode(mode: str, use_real_api: bool = False):
         async for chunk in orchestrator.process_stream(message):
             chunk_count += 1
             
-            # Extrair respostas dos agentes
-            for agent_name in ["search_agent", "property_agent", "scheduling_agent"]:
-                if agent_name in chunk:
-                    agent_data = chunk[agent_name]
-                    messages = agent_data.get("messages", [])
-                    if messages:
-                        content = messages[-1].get("content", "")
-                        responses.append((agent_name, content))
-                        logger.info(f"🤖 {agent_name.upper()}:")
-                        logger.info(f"📝 {content[:200]}...")
-                    break
+            # Extrair respostas dos agentes (log só depois do stream terminar)
+            hits = _AGENT_SET & chunk.keys()
+            if hits:
+                agent_name = min(hits, key=_AGENT_ORDER.__getitem__)
+                messages = chunk[agent_name].get("messages", [])
+                if messages:
+                    responses.append((agent_name, messages[-1].get("content", "")))
+        
+        # Prévia truncada só quando INFO está ativo; responses guarda o conteúdo completo
+        if logger.isEnabledFor(logging.INFO):
+            for agent_name, content in responses:
+                logger.info("🤖 %s:", agent_name.upper())
+                logger.info("📝 %s", _truncate(content))
         
         # Verificar uso da API
-        usage_after = api_monitor.get_rentcast_usage()
-        api_used = usage_after['total_used'] > usage['total_used']
+        post = api_monitor.snapshot()
+        api_used = post['total_used'] > pre['total_used']
         
         logger.info("-" * 60)
-        logger.info(f"📊 RESULTADO DO TESTE {mode.upper()}:")
-        logger.info(f"   ✅ Chunks processados: {chunk_count}")
-        logger.info(f"   🤖 Respostas de agentes: {len(responses)}")
-        logger.info(f"   🌐 API RentCast usada: {'Sim' if api_used else 'Não'}")
-        logger.info(f"   📈 Calls restantes: {usage_after['remaining']}/50")
+        logger.info("📊 RESULTADO DO TESTE %s:", mode.value.upper())
+        logger.info("   ✅ Chunks processados: %d", chunk_count)
+        logger.info("   🤖 Respostas de agentes: %d", len(responses))
+        logger.info("   🌐 API RentCast usada: %s", "Sim" if api_used else "Não")
+        logger.info("   📈 Calls restantes: %d/50", post["remaining"])
         
         # Verificar se a resposta menciona a fonte correta
         if responses:
@@ -104,73 +146,74 @@ async def test_mode(mode: str, use_real_api: bool = False):
         return chunk_count > 0 and len(responses) > 0
         
     except Exception as e:
-        logger.error(f"❌ Erro durante teste: {e}")
-        import traceback
-        logger.error(f"📋 Traceback: {traceback.format_exc()}")
+        # Traceback só quando DEBUG está ativo (formatado pelo logging)
+        logger.error("❌ Erro durante teste: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         return False
-        
-    finally:
-        await container.cleanup()
-        logger.info("🔧 Cleanup concluído")
 
 
 async def main():
     """Execução principal dos testes."""
+    from app.utils.logging import setup_logging
+    from app.utils.container import DIContainer
+    from app.orchestration.swarm import SwarmOrchestrator
+    from config.settings import get_settings
+    from config.api_config import APIMode
     
     logger = setup_logging()
     logger.info("🚀 TESTE DE MODOS DE API - Sistema Agêntico de Imóveis")
-    print("\n" + "=" * 70)
-    print("🎯 TESTE DE MODOS DE API")
-    print("=" * 70)
+    _write(_HEADER_BANNER)
+    
+    # Um container por modo; settings resolvidas uma única vez (lru_cache)
+    settings = get_settings()
+    c_mock = DIContainer()
+    c_real = None
     
     try:
-        # 1. Teste com modo MOCK (seguro, ilimitado)
-        logger.info("\n📦 FASE 1: TESTE MODO MOCK")
-        success_mock = await test_mode("mock")
-        
-        print(f"\n📦 MODO MOCK: {'✅ SUCESSO' if success_mock else '❌ FALHOU'}")
+        # FASE 1: mock. As fases rodam em sequência para que a chamada real da
+        # FASE 2 não apareça na janela de medição de uso da API da FASE 1
+        logger.info("\n📦 FASE 1: MODO MOCK")
+        await c_mock.setup(settings)
+        success_mock = await test_mode(c_mock.get(SwarmOrchestrator), APIMode.MOCK)
+        report = [f"\n📦 MODO MOCK: {'✅ SUCESSO' if success_mock else '❌ FALHOU'}"]
         
-        # 2. Pergunta para usar API real
-        print("\n" + "🔔" * 70)
-        print("⚠️  ATENÇÃO: TESTE COM API REAL")
-        print("🔔" * 70)
-        print("O próximo teste usará 1 call da sua API RentCast (49 restantes após o teste)")
-        print("Deseja prosseguir? Digite 'SIM' para confirmar ou qualquer outra coisa para pular:")
+        # Pergunta para usar API real
+        _write(_REAL_API_BANNER)
         
-        # Entrada real do usuário
-        user_input = input("👆 Sua resposta: ").strip().upper()
+        # Confirmação via variável de ambiente em vez de input() bloqueante
+        user_input = os.environ.get("RUN_REAL_API", "").strip().upper()
         
         if user_input == "SIM":
-            logger.info("\n🌐 FASE 2: TESTE MODO API REAL")
-            success_real = await test_mode("real", use_real_api=True)
-            print(f"\n🌐 MODO API REAL: {'✅ SUCESSO' if success_real else '❌ FALHOU'}")
+            # FASE 2: API real
+            logger.info("\n🌐 FASE 2: API REAL")
+            c_real = DIContainer()
+            await c_real.setup(settings)
+            success_real = await test_mode(c_real.get(SwarmOrchestrator), APIMode.REAL, use_real_api=True)
+            report.append(f"\n🌐 MODO API REAL: {'✅ SUCESSO' if success_real else '❌ FALHOU'}")
         else:
-            print("\n⏭️ TESTE COM API REAL PULADO (preservando suas calls)")
+            report.append("\n⏭️ TESTE COM API REAL PULADO (preservando suas calls)")
             success_real = True  # Não é falha, apenas pulado
         
-        # 3. Voltar para modo mock
-        logger.info("\n📦 FASE 3: RETORNANDO PARA MODO MOCK")
-        success_mock_final = await test_mode("mock")
-        print(f"\n📦 MODO MOCK FINAL: {'✅ SUCESSO' if success_mock_final else '❌ FALHOU'}")
-        
-        # Resultado final
-        print("\n" + "=" * 70)
-        if success_mock and success_real and success_mock_final:
-            print("🎉 TODOS OS TESTES PASSARAM!")
-            print("✅ Sistema funcionando em ambos os modos")
-            print("✅ API RentCast integrada e operacional")
-            print("✅ Modo mock funciona corretamente")
-            print("✅ Sistema pronto para produção")
-        else:
-            print("❌ ALGUNS TESTES FALHARAM")
-            print("📋 Verificar logs acima para detalhes")
-        
-        print("=" * 70)
+        # Resultado final (um único write para todo o resumo)
+        report.append("\n" + "=" * 70)
+        report.append(_SUCCESS_SUMMARY if success_mock and success_real else _FAILURE_SUMMARY)
+        report.append("=" * 70)
+        _write("\n".join(report) + "\n")
         
     except Exception as e:
-        logger.error(f"❌ Erro nos testes: {e}")
+        logger.error("❌ Erro nos testes: %s", e)
         print(f"\n❌ Erro durante execução dos testes: {e}")
+        
+    finally:
+        await c_mock.cleanup()
+        if c_real is not None:
+            await c_real.cleanup()
+        logger.info("🔧 Cleanup concluído")
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main()) 
\ No newline at end of file
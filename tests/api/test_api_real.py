@@ -3,72 +3,114 @@
 Teste do API server com agente real
 """
 
-import requests
+import asyncio
 import json
+import os
 
-def test_api_server():
+import aiohttp
+import pytest
+
+API_BASE_URL = "http://localhost:8000"
+PREVIEW_BYTES = 200
+MAX_BODY_BYTES = 1024 * 1024  # limite para a resposta do agente
+
+# Payloads fixos serializados uma única vez
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_SESSION_BYTES = json.dumps({
+    "property_id": "1",
+    "agent_mode": "details",
+    "user_preferences": {"name": "Test User"},
+    "language": "en"
+}).encode()
+_MSG_TEMPLATE = '{{"message": "hello Emma", "session_id": {sid}}}'
+
+VERBOSE = bool(os.environ.get("VERBOSE"))
+
+
+def _print_response(result: dict) -> None:
+    """Dump indentado só com VERBOSE; por padrão apenas as chaves."""
+    if VERBOSE:
+        print(f"   Response: {json.dumps(result, indent=2)}")
+    else:
+        print(f"   Response keys: {list(result)}")
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_api_server():
+    try:
+        async with aiohttp.ClientSession(base_url=API_BASE_URL) as s:
+            async with s.get("/api/health", timeout=aiohttp.ClientTimeout(total=5)):
+                pass
+    except aiohttp.ClientConnectorError as e:
+        pytest.skip(f"API não está rodando em {API_BASE_URL}: {e}")
+    assert await check_api_server()
+
+
+async def check_api_server():
     """Testa se o API server está funcionando com agente real"""
-    
+
     print("🧪 TESTE DO API SERVER COM AGENTE REAL")
     print("=" * 50)
-    
-    base_url = "http://localhost:8000/api"
-    
+
     try:
-        # 1. Testar health check
-        print("⏳ 1. Testando health check...")
-        health_response = requests.get(f"{base_url}/health?mode=real", timeout=10)
-        print(f"   Status: {health_response.status_code}")
-        print(f"   Response: {health_response.json()}")
-        
-        # 2. Criar sessão de agente
-        print("\n⏳ 2. Criando sessão de agente...")
-        session_data = {
-            "property_id": "1",
-            "agent_mode": "details",
-            "user_preferences": {"name": "Test User"},
-            "language": "en"
-        }
-        
-        session_response = requests.post(
-            f"{base_url}/agent/session/start?mode=real",
-            json=session_data,
-            timeout=30
-        )
-        print(f"   Status: {session_response.status_code}")
-        session_result = session_response.json()
-        print(f"   Response: {json.dumps(session_result, indent=2)}")
-        
-        if not session_result.get("success"):
-            print("❌ Falha ao criar sessão")
-            return False
-            
-        session_id = session_result["data"]["session"]["session_id"]
-        print(f"✅ Sessão criada: {session_id}")
-        
-        # 3. Enviar mensagem para o agente
-        print("\n⏳ 3. Enviando mensagem para o agente...")
-        message_data = {
-            "message": "hello Emma",
-            "session_id": session_id
-        }
-        
-        message_response = requests.post(
-            f"{base_url}/agent/chat?mode=real",
-            json=message_data,
-            timeout=30
-        )
-        print(f"   Status: {message_response.status_code}")
-        message_result = message_response.json()
-        print(f"   Response: {json.dumps(message_result, indent=2)}")
-        
+        # Uma única sessão (keep-alive) para as três chamadas
+        async with aiohttp.ClientSession(base_url=API_BASE_URL) as s:
+            # 1. Testar health check
+            print("⏳ 1. Testando health check...")
+            async with s.get("/api/health?mode=real", timeout=aiohttp.ClientTimeout(total=10)) as health_response:
+                print(f"   Status: {health_response.status}")
+                print(f"   Response: {await health_response.json()}")
+
+            # 2. Criar sessão de agente
+            print("\n⏳ 2. Criando sessão de agente...")
+            async with s.post(
+                "/api/agent/session/start?mode=real",
+                data=_SESSION_BYTES,
+                headers=_JSON_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as session_response:
+                print(f"   Status: {session_response.status}")
+                session_result = await session_response.json()
+            _print_response(session_result)
+
+            if not session_result.get("success"):
+                print("❌ Falha ao criar sessão")
+                return False
+
+            session_id = session_result["data"]["session"]["session_id"]
+            print(f"✅ Sessão criada: {session_id}")
+
+            # 3. Enviar mensagem para o agente
+            print("\n⏳ 3. Enviando mensagem para o agente...")
+            async with s.post(
+                "/api/agent/chat?mode=real",
+                data=_MSG_TEMPLATE.format(sid=json.dumps(session_id)).encode(),
+                headers=_JSON_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as message_response:
+                print(f"   Status: {message_response.status}")
+                if message_response.status != 200:
+                    # Erro: só uma prévia do corpo, sem bufferizar/parsear tudo
+                    preview = await message_response.content.read(PREVIEW_BYTES)
+                    print(f"   Response: {preview.decode('utf-8', 'ignore')}...")
+                    print("❌ Falha ao enviar mensagem")
+                    return False
+                # O JSONResponse do FastAPI sempre envia Content-Length: o limite é
+                # verificado antes de ler o corpo, que é então lido e parseado de uma vez
+                if (message_response.content_length or 0) > MAX_BODY_BYTES:
+                    print(f"❌ Resposta maior que {MAX_BODY_BYTES} bytes")
+                    return False
+                message_result = await message_response.json()
+            _print_response(message_result)
+
         if message_result.get("success"):
             agent_response = message_result["data"]
             print(f"\n✅ RESPOSTA DO AGENTE:")
             print(f"   Agente: {agent_response['agent_name']}")
             print(f"   Mensagem: {agent_response['message'][:200]}...")
             print(f"   Confiança: {agent_response['confidence']}")
-            
+
             # Verificar se é resposta real
             if "Emma" in agent_response["message"] and agent_response["confidence"] > 0.8:
                 print("🎯 SUCESSO: Resposta do agente real!")
@@ -79,8 +121,8 @@ def test_api_server():
         else:
             print("❌ Falha ao enviar mensagem")
             return False
-            
-    except requests.exceptions.ConnectionError:
+
+    except aiohttp.ClientConnectorError:
         print("❌ Erro: Servidor não está rodando")
         print("   Execute: python api_server.py")
         return False
@@ -89,8 +131,8 @@ def test_api_server():
         return False
 
 if __name__ == "__main__":
-    success = test_api_server()
+    success = asyncio.run(check_api_server())
     if success:
         print("\n🎉 TESTE CONCLUÍDO COM SUCESSO!")
     else:
-        print("\n💥 TESTE FALHOU!") 
\ No newline at end of file
+        print("\n💥 TESTE FALHOU!")
@@ -0,0 +1,39 @@
+"""
+Fixtures compartilhadas pelos testes do sistema agêntico.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+API_BASE_URL = "http://localhost:8000"
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Usar uvloop como event loop dos testes async quando disponível."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def orchestrator():
+    """SwarmOrchestrator compartilhado: compila o grafo uma vez por sessão de testes."""
+    from app.orchestration.swarm import get_swarm_orchestrator
+    return get_swarm_orchestrator()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client():
+    """Cliente HTTP da API local compartilhado (keep-alive) por worker."""
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=30.0) as client:
+        try:
+            await client.get("/api/health", timeout=5)
+        except httpx.HTTPError as e:
+            pytest.skip(f"API não está rodando em {API_BASE_URL}: {e}")
+        yield client
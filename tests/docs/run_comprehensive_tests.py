@@ -225,7 +225,7 @@ Exemplos de uso:
     
     print_banner()
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     results = None
     
     try:
@@ -243,7 +243,7 @@ Exemplos de uso:
             summary = create_test_summary(results)
             print(summary)
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         print(f"\n⏱️ Tempo total de execução: {execution_time:.2f}s")
         print("✅ Testes concluídos com sucesso!")
         
@@ -12,13 +12,15 @@ def test_config():
         from config.settings import get_settings
         
         settings = get_settings()
+        apis = settings.apis
+        models = settings.models
         
         print(f"App name: {settings.app_name}")
         print(f"Environment: {settings.environment}")
         print(f"Debug: {settings.debug}")
         
         # Test API key
-        api_key = settings.apis.openrouter_key
+        api_key = apis.openrouter_key
         print(f"API key loaded: {bool(api_key)}")
         
         if api_key:
@@ -26,9 +28,9 @@ def test_config():
             print(f"API key starts correctly: {api_key.startswith('sk-or-v1-')}")
         
         # Test models
-        print(f"Default model: {settings.models.default_model}")
-        print(f"Search model: {settings.models.search_model}")
-        print(f"Property model: {settings.models.property_model}")
+        print(f"Default model: {models.default_model}")
+        print(f"Search model: {models.search_model}")
+        print(f"Property model: {models.property_model}")
         
         # Test swarm config
         search_agent = settings.swarm.agents.get("search", {})
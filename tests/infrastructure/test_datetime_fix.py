@@ -11,6 +11,9 @@ import asyncio
 import sys
 import os
 from datetime import datetime
+from typing import Callable, List
+
+import pytest
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -25,85 +28,99 @@ from config.api_config import RentCastAPI, APIConfig, APIMode
 
 
 def test_datetime_context():
+    assert check_datetime_context()
+
+
+@pytest.mark.asyncio
+async def test_duckdb_integration():
+    assert await check_duckdb_integration()
+
+
+@pytest.mark.asyncio
+async def test_agent_datetime_awareness():
+    assert await check_agent_datetime_awareness()
+
+
+def check_datetime_context(log: Callable[[str], None] = print) -> bool:
     """Test datetime context generation."""
-    print("\n" + "="*60)
-    print("🕐 TESTING DATETIME CONTEXT")
-    print("="*60)
+    log("\n" + "="*60)
+    log("🕐 TESTING DATETIME CONTEXT")
+    log("="*60)
     
     # Test 1: Basic datetime context
     context = get_agent_datetime_context()
-    print(f"✅ Current date: {context['current_datetime']['date']}")
-    print(f"✅ Current time: {context['current_datetime']['time']}")
-    print(f"✅ Weekday: {context['current_datetime']['weekday_pt']}")
-    print(f"✅ Tomorrow: {context['relative_dates']['tomorrow']}")
-    print(f"✅ Next week: {context['relative_dates']['next_week']}")
+    log(f"✅ Current date: {context['current_datetime']['date']}")
+    log(f"✅ Current time: {context['current_datetime']['time']}")
+    log(f"✅ Weekday: {context['current_datetime']['weekday_pt']}")
+    log(f"✅ Tomorrow: {context['relative_dates']['tomorrow']}")
+    log(f"✅ Next week: {context['relative_dates']['next_week']}")
     
     # Test 2: Agent prompt format
     agent_context = format_datetime_context_for_agent()
-    print(f"\n📝 Agent context length: {len(agent_context)} characters")
-    print("📝 Agent context preview:")
-    print(agent_context[:200] + "...")
+    log(f"\n📝 Agent context length: {len(agent_context)} characters")
+    log("📝 Agent context preview:")
+    log(agent_context[:200] + "...")
     
     # Test 3: Scheduling context
     scheduling_context = get_scheduling_context_for_agent()
-    print(f"\n📅 Scheduling context length: {len(scheduling_context)} characters")
-    print("📅 Scheduling context preview:")
-    print(scheduling_context[:300] + "...")
+    log(f"\n📅 Scheduling context length: {len(scheduling_context)} characters")
+    log("📅 Scheduling context preview:")
+    log(scheduling_context[:300] + "...")
     
     return True
 
 
-def test_duckdb_integration():
+async def check_duckdb_integration(log: Callable[[str], None] = print) -> bool:
     """Test DuckDB integration for Mock mode."""
-    print("\n" + "="*60)
-    print("🦆 TESTING DUCKDB INTEGRATION")
-    print("="*60)
+    log("\n" + "="*60)
+    log("🦆 TESTING DUCKDB INTEGRATION")
+    log("="*60)
     
     try:
         # Test 1: Migration
-        print("🔄 Testing migration...")
-        success = migrate_mock_to_duckdb(force_reload=True)
+        log("🔄 Testing migration...")
+        success = await asyncio.to_thread(migrate_mock_to_duckdb, force_reload=True)
         if not success:
-            print("❌ Migration failed!")
+            log("❌ Migration failed!")
             return False
-        print("✅ Migration successful!")
+        log("✅ Migration successful!")
         
         # Test 2: Verification
-        print("\n🔍 Testing verification...")
-        success = verify_migration()
+        log("\n🔍 Testing verification...")
+        success = await asyncio.to_thread(verify_migration)
         if not success:
-            print("❌ Verification failed!")
+            log("❌ Verification failed!")
             return False  
-        print("✅ Verification successful!")
+        log("✅ Verification successful!")
         
         # Test 3: API integration
-        print("\n🌐 Testing API integration...")
+        log("\n🌐 Testing API integration...")
         config = APIConfig(mode=APIMode.MOCK)
         api = RentCastAPI(config)
         
         # Test search
-        properties = api.search_properties({"city": "Miami", "bedrooms": 2})
-        print(f"✅ Found {len(properties)} properties with 2 bedrooms in Miami")
+        properties = await asyncio.to_thread(api.search_properties, {"city": "Miami", "bedrooms": 2})
+        log(f"✅ Found {len(properties)} properties with 2 bedrooms in Miami")
         
         if len(properties) > 0:
             sample_prop = properties[0]
-            print(f"📍 Sample property: {sample_prop['formattedAddress']}")
-            print(f"💰 Price: ${sample_prop['price']}/month")
-            print(f"🛏️ Bedrooms: {sample_prop['bedrooms']}")
-            print(f"🚿 Bathrooms: {sample_prop['bathrooms']}")
+            log(f"📍 Sample property: {sample_prop['formattedAddress']}")
+            log(f"💰 Price: ${sample_prop['price']}/month")
+            log(f"🛏️ Bedrooms: {sample_prop['bedrooms']}")
+            log(f"🚿 Bathrooms: {sample_prop['bathrooms']}")
         
         return True
         
     except Exception as e:
-        print(f"❌ DuckDB integration test failed: {e}")
+        log(f"❌ DuckDB integration test failed: {e}")
         return False
 
 
-async def test_agent_datetime_awareness():
+async def check_agent_datetime_awareness(log: Callable[[str], None] = print) -> bool:
     """Test that agents now have datetime awareness."""
-    print("\n" + "="*60)
-    print("🤖 TESTING AGENT DATETIME AWARENESS")
-    print("="*60)
+    log("\n" + "="*60)
+    log("🤖 TESTING AGENT DATETIME AWARENESS")
+    log("="*60)
     
     try:
         # This would require running the full swarm, which is complex
@@ -114,38 +131,40 @@ async def test_agent_datetime_awareness():
         context = get_agent_datetime_context()
         current_date = context['current_datetime']['date']
         
-        print(f"✅ Today's date: {current_date}")
-        print(f"✅ Tomorrow will be: {context['relative_dates']['tomorrow']}")
+        log(f"✅ Today's date: {current_date}")
+        log(f"✅ Tomorrow will be: {context['relative_dates']['tomorrow']}")
         
         # Verify the date is correct (today should be July 23rd, 2025)
         today = datetime.now().date().isoformat()
         if current_date == today:
-            print("✅ Date context is accurate!")
+            log("✅ Date context is accurate!")
             return True
         else:
-            print(f"⚠️ Date mismatch - context: {current_date}, actual: {today}")
+            log(f"⚠️ Date mismatch - context: {current_date}, actual: {today}")
             return False
             
     except Exception as e:
-        print(f"❌ Agent datetime awareness test failed: {e}")
+        log(f"❌ Agent datetime awareness test failed: {e}")
         return False
 
 
-def main():
+async def main():
     """Run all tests."""
     print("🚀 STARTING DATETIME & DUCKDB FIX TESTS")
     print("="*60)
     
-    results = []
-    
-    # Test 1: Datetime Context
-    results.append(test_datetime_context())
-    
-    # Test 2: DuckDB Integration  
-    results.append(test_duckdb_integration())
-    
-    # Test 3: Agent Datetime Awareness
-    results.append(asyncio.run(test_agent_datetime_awareness()))
+    # As três verificações rodam em paralelo; as chamadas bloqueantes do DuckDB
+    # vão para threads (asyncio.to_thread). Cada uma escreve num buffer próprio,
+    # impresso em ordem no final, para que a saída não fique intercalada
+    # (mensagens impressas pela própria migração ainda saem direto no stdout)
+    buffers: List[List[str]] = [[], [], []]
+    results = await asyncio.gather(
+        asyncio.to_thread(check_datetime_context, buffers[0].append),  # Test 1: Datetime Context
+        check_duckdb_integration(buffers[1].append),                   # Test 2: DuckDB Integration
+        check_agent_datetime_awareness(buffers[2].append)              # Test 3: Agent Datetime Awareness
+    )
+    for lines in buffers:
+        print("\n".join(lines))
     
     # Summary
     print("\n" + "="*60)
@@ -171,5 +190,5 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -13,10 +13,11 @@ env_exists = os.path.exists('.env')
 print(f"1. .env file exists: {env_exists}")
 
 if env_exists:
+    # Só o tamanho e a primeira linha não vazia: sem ler o arquivo inteiro
     with open('.env', 'r') as f:
-        content = f.read()
-    print(f"2. .env content length: {len(content)} chars")
-    print(f"3. .env first line: {content.split()[0] if content.strip() else 'EMPTY'}")
+        first_line = next((line.strip() for line in f if line.strip()), "")
+    print(f"2. .env content length: {os.path.getsize('.env')} bytes")
+    print(f"3. .env first line: {first_line or 'EMPTY'}")
 
 # 2. Carregar .env
 load_result = load_dotenv()
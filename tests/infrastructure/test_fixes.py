@@ -5,52 +5,51 @@ Tests both datetime context and DuckDB integration without emojis.
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-def test_datetime_context():
+def test_datetime_context(log=print):
     """Test datetime context generation."""
-    print("Testing datetime context...")
+    log("Testing datetime context...")
     
     try:
         from app.utils.datetime_context import get_agent_datetime_context
         context = get_agent_datetime_context()
         
-        print(f"Current date: {context['current_datetime']['date']}")
-        print(f"Tomorrow: {context['relative_dates']['tomorrow']}")
-        print("Datetime context: WORKING")
+        log(f"Current date: {context['current_datetime']['date']}")
+        log(f"Tomorrow: {context['relative_dates']['tomorrow']}")
+        log("Datetime context: WORKING")
         return True
     except Exception as e:
-        print(f"Datetime context failed: {e}")
+        log(f"Datetime context failed: {e}")
         return False
 
-def test_duckdb_connection():
+def test_duckdb_connection(log=print):
     """Test DuckDB connection and basic operations."""
-    print("Testing DuckDB connection...")
+    log("Testing DuckDB connection...")
     
     try:
         from app.database.schema import PropertyDB
         
-        # Test connection
-        db = PropertyDB("test_properties.duckdb")
+        # Test connection (in-memory: no file to create or clean up, and no
+        # contention with data/properties.duckdb used by test_api_config in __main__)
+        db = PropertyDB(":memory:")
         count = db.get_property_count()
-        print(f"DuckDB connection successful. Property count: {count}")
+        log(f"DuckDB connection successful. Property count: {count}")
         
-        # Clean up
         db.close()
-        if os.path.exists("test_properties.duckdb"):
-            os.remove("test_properties.duckdb")
         
-        print("DuckDB integration: WORKING")
+        log("DuckDB integration: WORKING")
         return True
     except Exception as e:
-        print(f"DuckDB integration failed: {e}")
+        log(f"DuckDB integration failed: {e}")
         return False
 
-def test_api_config():
+def test_api_config(log=print):
     """Test API config without DuckDB errors."""
-    print("Testing API config...")
+    log("Testing API config...")
     
     try:
         from config.api_config import RentCastAPI, APIConfig, APIMode
@@ -61,21 +60,27 @@ def test_api_config():
         
         # Test search (should fallback to in-memory if DuckDB fails)
         properties = api.search_properties({"city": "Miami"})
-        print(f"Found {len(properties)} properties")
-        print("API config: WORKING")
+        log(f"Found {len(properties)} properties")
+        log("API config: WORKING")
         return True
     except Exception as e:
-        print(f"API config failed: {e}")
+        log(f"API config failed: {e}")
         return False
 
 if __name__ == "__main__":
     print("Running basic functionality tests...")
     print("=" * 50)
     
-    results = []
-    results.append(test_datetime_context())
-    results.append(test_duckdb_connection())
-    results.append(test_api_config())
+    # Independent tests: run concurrently, total time ~ the slowest one.
+    # Each test logs into its own buffer, printed in order so output doesn't interleave
+    tests = (test_datetime_context, test_duckdb_connection, test_api_config)
+    buffers = [[] for _ in tests]
+    with ThreadPoolExecutor(max_workers=len(tests)) as ex:
+        futures = [ex.submit(f, buf.append) for f, buf in zip(tests, buffers)]
+        results = [f.result() for f in futures]
+    
+    for lines in buffers:
+        print("\n".join(lines))
     
     print("=" * 50)
     passed = sum(results)
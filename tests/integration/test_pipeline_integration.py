@@ -161,7 +161,7 @@ class RealEstateTestPipeline:
         print(f"\n🎯 Executando cenário: {scenario.name}")
         print(f"📝 {scenario.description}")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # 1. Executar stress test se aplicável
         stress_results = None
@@ -204,7 +204,7 @@ class RealEstateTestPipeline:
             scenario, stress_results, conversation_analysis, integration_metrics
         )
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         print(f"   ✅ Cenário concluído em {execution_time:.2f}s")
         
         # Criar resultado
@@ -5,11 +5,101 @@ Comparação com o modelo Llama Maverick
 """
 
 import asyncio
-import httpx
+import functools
+import logging
+from typing import TYPE_CHECKING, Optional
+
 from config.settings import get_settings
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openrouter import OpenRouterProvider
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+if TYPE_CHECKING:
+    import httpx
+    from pydantic_ai import Agent
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo (s) de cada etapa de main(): um modelo travado não bloqueia a suíte
+TEST_TIMEOUT_S = 60.0
+
+# Settings resolvidas uma vez para todos os modelos testados
+_SETTINGS = get_settings()
+
+# Cliente HTTP/2 compartilhado por todos os modelos e sub-testes (teste HTTP
+# direto e PydanticAI): um pool keep-alive em vez de um handshake por chamada.
+# Criado sob demanda para que coletar o módulo não importe httpx.
+_CLIENT: Optional["httpx.AsyncClient"] = None
+
+
+def _get_client() -> "httpx.AsyncClient":
+    """Retornar o cliente compartilhado, criando-o no primeiro uso."""
+    global _CLIENT
+    if _CLIENT is None:
+        import httpx
+        _CLIENT = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+            timeout=30.0
+        )
+    return _CLIENT
+
+
+@functools.lru_cache(maxsize=8)
+def _agent_for(model_name: str, api_key: str) -> "Agent":
+    """Agent PydanticAI por (modelo, chave), reaproveitado entre chamadas e retries."""
+    # Imports pesados só quando o teste realmente roda
+    from pydantic_ai import Agent
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openrouter import OpenRouterProvider
+    
+    model = OpenAIModel(
+        model_name,
+        provider=OpenRouterProvider(api_key=api_key, http_client=_get_client()),
+    )
+    return Agent(model)
+
+# Prompts fixos compartilhados por todos os modelos comparados (construídos uma vez)
+PROPERTY_CONTEXT_STR = """
+PROPERTY DETAILS:
+• Address: 467 Nw 8th St, Apt 3, Miami, FL 33136
+• Price: $1,450/month
+• Bedrooms: 0 (Studio)
+• Bathrooms: 1
+• Square Footage: 502 sq ft
+• Property Type: Apartment
+• Year Built: 1950
+• City: Miami, FL
+"""
+
+REAL_ESTATE_PROMPT = f"""You are Emma, a professional real estate property expert. You provide clear, objective, and helpful information about properties.
+
+{PROPERTY_CONTEXT_STR}
+
+User's Question: "How much is the rent for this property?"
+
+INSTRUCTIONS:
+1. Answer the user's question directly using the property details above
+2. Reference the specific property address
+3. Be professional but friendly (2-3 sentences)
+4. Use appropriate emojis
+5. End with a helpful follow-up question
+
+Respond as Emma:"""
+
+COMPLEX_PROMPT = """You are a real estate expert. A client asks: "I need a property with these requirements: under $2000/month, at least 1 bedroom, pet-friendly, and close to public transport in Miami. Can you analyze if this property meets my needs?"
+
+Property: 467 Nw 8th St, Apt 3, Miami, FL 33136
+- Rent: $1,450/month
+- Bedrooms: 0 (Studio)
+- Pet Policy: No pets allowed
+- Location: Downtown Miami, near metro stations
+
+Analyze each requirement and give a clear recommendation."""
 
 async def test_openrouter_model(model_name: str, test_name: str):
     """Testar um modelo específico do OpenRouter."""
@@ -17,8 +107,7 @@ async def test_openrouter_model(model_name: str, test_name: str):
     print(f"\n🧪 Testing {test_name}")
     print("=" * 60)
     
-    settings = get_settings()
-    api_key = settings.apis.openrouter_key
+    api_key = _SETTINGS.apis.openrouter_key
     
     if not api_key or api_key.strip() == "":
         print("❌ No API key found!")
@@ -28,10 +117,13 @@ async def test_openrouter_model(model_name: str, test_name: str):
     print(f"🤖 Testing model: {model_name}")
     
     try:
-        # Teste 1: Chamada HTTP direta
-        print("\n📡 Test 1: Direct HTTP call...")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
+        client = _get_client()
+        agent = _agent_for(model_name, api_key)
+        
+        # Os 4 testes são independentes: disparados juntos, resultados impressos em ordem
+        print("\n🚀 Running tests 1-4 concurrently...")
+        async with asyncio.TaskGroup() as tg:
+            http_task = tg.create_task(client.post(
                 "https://openrouter.ai/api/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {api_key}",
@@ -44,82 +136,40 @@ async def test_openrouter_model(model_name: str, test_name: str):
                     "max_tokens": 50
                 },
                 timeout=30.0
-            )
-            
-            print(f"📊 HTTP Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-                print(f"✅ HTTP Response: {content}")
-                http_success = True
-            else:
-                print(f"❌ HTTP Error: {response.status_code}")
-                print(f"❌ Response: {response.text}")
-                return False, ""
+            ))
+            pydantic_task = tg.create_task(agent.run("Say 'PydanticAI working with this model!' and nothing else."))
+            real_estate_task = tg.create_task(agent.run(REAL_ESTATE_PROMPT))
+            complex_task = tg.create_task(agent.run(COMPLEX_PROMPT))
+        
+        # Teste 1: Chamada HTTP direta
+        print("\n📡 Test 1: Direct HTTP call...")
+        response = http_task.result()
+        print(f"📊 HTTP Status: {response.status_code}")
+        
+        if response.status_code == 200:
+            result = _loads(response.content)
+            content = result["choices"][0]["message"]["content"]
+            print(f"✅ HTTP Response: {content}")
+            http_success = True
+        else:
+            print(f"❌ HTTP Error: {response.status_code}")
+            print(f"❌ Response: {response.text}")
+            return False, ""
         
         # Teste 2: PydanticAI
         print("\n🤖 Test 2: PydanticAI integration...")
-        model = OpenAIModel(
-            model_name,
-            provider=OpenRouterProvider(api_key=api_key),
-        )
-        agent = Agent(model)
-        
-        response = await agent.run("Say 'PydanticAI working with this model!' and nothing else.")
-        pydantic_content = str(response.output)
+        pydantic_content = str(pydantic_task.result().output)
         print(f"✅ PydanticAI Response: {pydantic_content}")
         
         # Teste 3: Real Estate Agent Test
         print("\n🏠 Test 3: Real Estate Agent simulation...")
-        
-        property_context = """
-PROPERTY DETAILS:
-• Address: 467 Nw 8th St, Apt 3, Miami, FL 33136
-• Price: $1,450/month
-• Bedrooms: 0 (Studio)
-• Bathrooms: 1
-• Square Footage: 502 sq ft
-• Property Type: Apartment
-• Year Built: 1950
-• City: Miami, FL
-"""
-        
-        real_estate_prompt = f"""You are Emma, a professional real estate property expert. You provide clear, objective, and helpful information about properties.
-
-{property_context}
-
-User's Question: "How much is the rent for this property?"
-
-INSTRUCTIONS:
-1. Answer the user's question directly using the property details above
-2. Reference the specific property address
-3. Be professional but friendly (2-3 sentences)
-4. Use appropriate emojis
-5. End with a helpful follow-up question
-
-Respond as Emma:"""
-
-        real_estate_response = await agent.run(real_estate_prompt)
-        real_estate_content = str(real_estate_response.output)
+        real_estate_content = str(real_estate_task.result().output)
         print(f"✅ Real Estate Response ({len(real_estate_content)} chars):")
         print(f"📝 Content: {real_estate_content}")
         
         # Teste 4: Complex reasoning
         print("\n🧠 Test 4: Complex reasoning test...")
-        
-        complex_prompt = """You are a real estate expert. A client asks: "I need a property with these requirements: under $2000/month, at least 1 bedroom, pet-friendly, and close to public transport in Miami. Can you analyze if this property meets my needs?"
-
-Property: 467 Nw 8th St, Apt 3, Miami, FL 33136
-- Rent: $1,450/month
-- Bedrooms: 0 (Studio)
-- Pet Policy: No pets allowed
-- Location: Downtown Miami, near metro stations
-
-Analyze each requirement and give a clear recommendation."""
-
-        complex_response = await agent.run(complex_prompt)
-        complex_content = str(complex_response.output)
+        complex_content = str(complex_task.result().output)
         print(f"✅ Complex Response ({len(complex_content)} chars):")
         print(f"📝 Analysis: {complex_content[:200]}...")
         
@@ -132,8 +182,7 @@ Analyze each requirement and give a clear recommendation."""
         
     except Exception as e:
         print(f"❌ Error testing {model_name}: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.exception("Error testing %s", model_name)
         return False, str(e)
 
 async def compare_models():
@@ -142,22 +191,15 @@ async def compare_models():
     print("🔄 OPENROUTER MODEL COMPARISON")
     print("=" * 80)
     
-    # Testar Llama Maverick
-    maverick_success, maverick_responses = await test_openrouter_model(
-        "meta-llama/llama-4-maverick:free",
-        "Llama-4 Maverick (Current)"
-    )
-    
-    # Testar Gemma-3
-    gemma_success, gemma_responses = await test_openrouter_model(
-        "google/gemma-3-27b-it:free",
-        "Google Gemma-3-27B-IT (New)"
-    ) 
-
-        # Testar Gemma-3
-    kimi_success, kimi_responses = await test_openrouter_model(
-        "moonshotai/kimi-k2:free",
-        "Kimi-K2 (New)"
+    # Testar Llama Maverick, Gemma-3 e Kimi-K2 em paralelo (I/O no OpenRouter)
+    (
+        (maverick_success, maverick_responses),
+        (gemma_success, gemma_responses),
+        (kimi_success, kimi_responses),
+    ) = await asyncio.gather(
+        test_openrouter_model("meta-llama/llama-4-maverick:free", "Llama-4 Maverick (Current)"),
+        test_openrouter_model("google/gemma-3-27b-it:free", "Google Gemma-3-27B-IT (New)"),
+        test_openrouter_model("moonshotai/kimi-k2:free", "Kimi-K2 (New)"),
     )
     
     # Comparação final
@@ -221,6 +263,7 @@ async def test_gemma_in_swarm():
         # Simular mensagem do usuário
         test_message = {
             "messages": [{"role": "user", "content": "Hello, how much is the rent for this property?"}],
+            "current_agent": "property_agent",
             "context": {
                 "property_context": {
                     "formattedAddress": "467 Nw 8th St, Apt 3, Miami, FL 33136",
@@ -231,7 +274,8 @@ async def test_gemma_in_swarm():
                     "propertyType": "Apartment",
                     "yearBuilt": 1950
                 },
-                "data_mode": "mock"
+                "data_mode": "mock",
+                "direct_routing": True  # testar o modelo no property_agent, sem roteamento
             }
         }
         
@@ -253,19 +297,37 @@ async def test_gemma_in_swarm():
 
 async def main():
     """Executar todos os testes."""
+    global _CLIENT
     
     print("🚀 GEMMA-3-27B-IT MODEL TEST SUITE")
     print("=" * 80)
     
-    # Teste 1: Comparação de modelos
-    gemma_works, maverick_works, kimi_works = await compare_models()
-    
-    # Teste 2: Integração no Swarm (se Gemma funcionar)
-    if gemma_works:
-        swarm_works = await test_gemma_in_swarm()
-    else:
-        swarm_works = False
-        print("\n⏭️ Skipping Swarm test - Gemma-3 not available")
+    try:
+        # Teste 1: Comparação de modelos
+        try:
+            gemma_works, maverick_works, kimi_works = await asyncio.wait_for(
+                compare_models(), timeout=TEST_TIMEOUT_S
+            )
+        except asyncio.TimeoutError:
+            print(f"\n⏱️ Model comparison exceeded {TEST_TIMEOUT_S:.0f}s - treating all models as failed")
+            gemma_works = maverick_works = kimi_works = False
+        
+        # Teste 2: Integração no Swarm (se Gemma funcionar)
+        if gemma_works:
+            try:
+                swarm_works = await asyncio.wait_for(test_gemma_in_swarm(), timeout=TEST_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                print(f"\n⏱️ Swarm test exceeded {TEST_TIMEOUT_S:.0f}s")
+                swarm_works = False
+        else:
+            swarm_works = False
+            print("\n⏭️ Skipping Swarm test - Gemma-3 not available")
+    finally:
+        # Cliente e agentes ficam presos ao event loop desta execução
+        if _CLIENT is not None:
+            await _CLIENT.aclose()
+            _CLIENT = None
+        _agent_for.cache_clear()
     
     # Resultado final
     print("\n" + "=" * 80)
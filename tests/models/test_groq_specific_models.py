@@ -16,15 +16,34 @@ import os
 import json
 import math
 import asyncio
+import hashlib
+import itertools
+import shelve
+import time
 import traceback
+from pathlib import Path
 from typing import Dict, List, Any
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Arquivos auxiliares das execuções ficam em .cache/groq na raiz do repositório (gitignored)
+CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "groq"
+
 class GroqSpecificModelTester:
     """Testador específico para modelos Groq solicitados"""
     
+    # Máximo de modelos testados ao mesmo tempo (respeitar rate limit da Groq)
+    max_concurrency = 3
+    
+    # Cache persistente das respostas das sondas (desligar com GROQ_PROBE_CACHE=0)
+    cache_path = CACHE_DIR / "probe_cache"
+    
+    # Modelos que falharam ficam fora das próximas execuções durante o cooldown
+    # (GROQ_DEADLIST_COOLDOWN_S, em segundos; 0 testa todos novamente)
+    deadlist_path = CACHE_DIR / "deadlist.json"
+    deadlist_cooldown_s = float(os.getenv("GROQ_DEADLIST_COOLDOWN_S", "3600"))
+    
     def __init__(self):
         self.groq_api_key = os.getenv("GROQ_API_KEY")
         
@@ -37,14 +56,31 @@ class GroqSpecificModelTester:
             "qwen/qwen3-32b"
         ]
         
-        # Prompt de teste otimizado
-        self.test_prompt = "Explain machine learning in exactly 20 words."
+        # Prompts de teste (mesmo formato), alternados entre os modelos para que o
+        # cache de prefixo da Groq não favoreça os modelos testados depois
+        self.test_prompts = [
+            "Explain machine learning in exactly 20 words.",
+            "Describe photosynthesis in exactly 20 words.",
+            "Summarize the concept of entropy in exactly 20 words.",
+            "Explain how a compiler works in exactly 20 words.",
+            "Describe the water cycle in exactly 20 words."
+        ]
+        
+        self._cache = None
+        # Modelos com alguma resposta vinda do cache (sem chamada de rede)
+        self._cache_hits = set()
+        self._deadlist = self._load_deadlist()
         
         # Configurar cliente
         if self.groq_api_key:
             try:
-                from groq import Groq
-                self.client = Groq(api_key=self.groq_api_key)
+                from groq import AsyncGroq
+                from groq.types.chat import ChatCompletion
+                self.client = AsyncGroq(api_key=self.groq_api_key)
+                self._completion_type = ChatCompletion
+                if os.getenv("GROQ_PROBE_CACHE", "1") != "0":
+                    self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._cache = shelve.open(str(self.cache_path))
                 print("✅ Cliente Groq configurado")
             except ImportError:
                 print("❌ Biblioteca Groq não disponível")
@@ -59,40 +95,157 @@ class GroqSpecificModelTester:
         print(f" {title}")
         print(f"{'='*70}")
     
-    async def test_model_comprehensive(self, model_name: str) -> Dict[str, Any]:
+    def _load_deadlist(self) -> Dict[str, float]:
+        """Carregar {modelo: timestamp da última falha} do arquivo auxiliar."""
+        try:
+            with open(self.deadlist_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_deadlist(self):
+        """Persistir a lista de modelos com falha recente."""
+        try:
+            self.deadlist_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.deadlist_path, 'w', encoding='utf-8') as f:
+                json.dump(self._deadlist, f, indent=2)
+        except OSError as e:
+            print(f"❌ Erro ao salvar lista de modelos com falha: {e}")
+    
+    def close(self):
+        """Fechar o cache persistente de respostas."""
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+    
+    async def _create_completion(self, *, stream: bool = False, **kwargs):
+        """
+        chat.completions.create com cache persistente por parâmetros da chamada.
+        
+        Só respostas bem-sucedidas são guardadas; a resposta em cache é revalidada
+        como ChatCompletion, então o acesso a choices/logprobs não muda. Com
+        stream=True a resposta é consumida em streaming e remontada.
+        """
+        key = None
+        if self._cache is not None:
+            key = hashlib.sha256(json.dumps(kwargs, sort_keys=True).encode()).hexdigest()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache_hits.add(kwargs.get("model"))
+                return self._completion_type.model_validate(cached)
+        
+        if stream:
+            response = await self._stream_completion(**kwargs)
+        else:
+            response = await self.client.chat.completions.create(**kwargs)
+        
+        if key is not None:
+            self._cache[key] = response.model_dump()
+        return response
+    
+    async def _stream_completion(self, **kwargs):
+        """Consumir a resposta em streaming e remontá-la como um ChatCompletion."""
+        stream = await self.client.chat.completions.create(stream=True, **kwargs)
+        
+        first = None
+        finish_reason = "stop"
+        content_parts: List[str] = []
+        token_logprobs: List[Dict[str, Any]] = []
+        
+        # Conteúdo e logprobs acumulados à medida que os chunks chegam
+        async for chunk in stream:
+            first = first or chunk
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta.content:
+                content_parts.append(choice.delta.content)
+            if choice.logprobs and choice.logprobs.content:
+                token_logprobs.extend(lp.model_dump() for lp in choice.logprobs.content)
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        
+        if first is None:
+            raise RuntimeError("Stream vazio retornado pela Groq")
+        
+        return self._completion_type.model_validate({
+            "id": first.id,
+            "object": "chat.completion",
+            "created": first.created,
+            "model": first.model,
+            "choices": [{
+                "index": 0,
+                "finish_reason": finish_reason,
+                "message": {"role": "assistant", "content": "".join(content_parts)},
+                "logprobs": {"content": token_logprobs} if token_logprobs else None
+            }]
+        })
+    
+    async def test_model_comprehensive(self, model_name: str, prompt: str) -> Dict[str, Any]:
         """Teste abrangente de um modelo específico"""
         
-        print(f"\n🤖 TESTANDO: {model_name}")
-        print("-" * 50)
+        # Saída bufferizada por modelo: com os testes concorrentes, cada bloco
+        # é impresso inteiro quando o modelo termina
+        lines: List[str] = []
+        try:
+            return await self._test_model(model_name, prompt, lines.append)
+        finally:
+            print("\n".join(lines))
+    
+    async def _test_model(self, model_name: str, prompt: str, out) -> Dict[str, Any]:
+        """Executar os testes de um modelo, escrevendo a saída via out()"""
+        
+        out(f"\n🤖 TESTANDO: {model_name}")
+        out(f"📝 Prompt: {prompt}")
+        out("-" * 50)
         
         if not self.client:
             return {
                 "model": model_name,
+                "prompt": prompt,
                 "status": "error",
                 "error": "Cliente Groq não disponível"
             }
         
         result = {
             "model": model_name,
+            "prompt": prompt,
             "basic_functionality": False,
             "logprobs_supported": False,
             "nll_calculable": False,
             "status": "unknown"
         }
         
-        # TESTE 1: Funcionalidade básica
-        print("🔍 Teste 1: Funcionalidade básica...")
-        try:
-            basic_response = self.client.chat.completions.create(
+        # Testes 1 e 2 são chamadas independentes: disparadas juntas
+        messages = [{"role": "user", "content": prompt}]
+        basic_response, logprobs_response = await asyncio.gather(
+            self._create_completion(
                 model=model_name,
-                messages=[{"role": "user", "content": self.test_prompt}],
+                messages=messages,
                 temperature=0.3,
                 max_tokens=30
-            )
+            ),
+            self._create_completion(
+                model=model_name,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=30,
+                logprobs=True,
+                top_logprobs=5,
+                stream=True
+            ),
+            return_exceptions=True
+        )
+        
+        # TESTE 1: Funcionalidade básica
+        out("🔍 Teste 1: Funcionalidade básica...")
+        try:
+            if isinstance(basic_response, Exception):
+                raise basic_response
             
             response_text = basic_response.choices[0].message.content
-            print(f"✅ Funcionalidade básica OK")
-            print(f"📤 Resposta: {response_text[:60]}...")
+            out(f"✅ Funcionalidade básica OK")
+            out(f"📤 Resposta: {response_text[:60]}...")
             
             result.update({
                 "basic_functionality": True,
@@ -101,7 +254,8 @@ class GroqSpecificModelTester:
             })
             
         except Exception as e:
-            print(f"❌ Funcionalidade básica FALHOU: {e}")
+            out(f"❌ Funcionalidade básica FALHOU: {e}")
+            self._deadlist[model_name] = time.time()
             result.update({
                 "status": "error",
                 "error": str(e)
@@ -109,27 +263,21 @@ class GroqSpecificModelTester:
             return result
         
         # TESTE 2: Suporte a logprobs
-        print("\n🔍 Teste 2: Suporte a logprobs...")
+        out("\n🔍 Teste 2: Suporte a logprobs...")
         try:
-            logprobs_response = self.client.chat.completions.create(
-                model=model_name,
-                messages=[{"role": "user", "content": self.test_prompt}],
-                temperature=0.1,
-                max_tokens=30,
-                logprobs=True,
-                top_logprobs=5
-            )
+            if isinstance(logprobs_response, Exception):
+                raise logprobs_response
             
-            print("✅ Logprobs suportados!")
+            out("✅ Logprobs suportados!")
             result["logprobs_supported"] = True
             
             # TESTE 3: Análise detalhada dos logprobs
-            print("\n🔍 Teste 3: Análise de logprobs...")
+            out("\n🔍 Teste 3: Análise de logprobs...")
             choice = logprobs_response.choices[0]
             
             if hasattr(choice, 'logprobs') and choice.logprobs:
                 logprobs = choice.logprobs
-                print(f"📊 Estrutura logprobs: {type(logprobs)}")
+                out(f"📊 Estrutura logprobs: {type(logprobs)}")
                 
                 # Verificar atributos do logprobs
                 logprobs_attrs = []
@@ -142,40 +290,42 @@ class GroqSpecificModelTester:
                         except:
                             continue
                 
-                print(f"📋 Atributos logprobs: {logprobs_attrs}")
+                out(f"📋 Atributos logprobs: {logprobs_attrs}")
                 
                 # Verificar tokens individuais
                 if hasattr(logprobs, 'content') and logprobs.content:
-                    print(f"🎯 TOKENS ENCONTRADOS: {len(logprobs.content)}")
+                    out(f"🎯 TOKENS ENCONTRADOS: {len(logprobs.content)}")
                     
-                    total_logprob = 0.0
                     token_details = []
                     
-                    for i, token_logprob in enumerate(logprobs.content):
-                        if i < 5:  # Mostrar apenas primeiros 5 tokens
-                            token = getattr(token_logprob, 'token', 'N/A')
-                            logprob = getattr(token_logprob, 'logprob', 0.0)
-                            
-                            print(f"  Token {i}: '{token}' -> logprob: {logprob:.4f}")
-                            
-                            total_logprob += logprob
-                            token_details.append({
-                                "token": token,
-                                "logprob": logprob
-                            })
-                            
-                            # Verificar alternativas
-                            if hasattr(token_logprob, 'top_logprobs') and token_logprob.top_logprobs:
-                                print(f"    🔄 Alternativas:")
-                                for j, alt in enumerate(token_logprob.top_logprobs[:3]):
-                                    alt_token = getattr(alt, 'token', 'N/A')
-                                    alt_logprob = getattr(alt, 'logprob', 0.0)
-                                    print(f"      {j+1}. '{alt_token}': {alt_logprob:.4f}")
+                    # Mostrar apenas primeiros 5 tokens
+                    for i, token_logprob in enumerate(logprobs.content[:5]):
+                        token = getattr(token_logprob, 'token', 'N/A')
+                        logprob = getattr(token_logprob, 'logprob', 0.0)
+                        
+                        out(f"  Token {i}: '{token}' -> logprob: {logprob:.4f}")
+                        
+                        token_details.append({
+                            "token": token,
+                            "logprob": logprob
+                        })
+                        
+                        # Verificar alternativas
+                        if hasattr(token_logprob, 'top_logprobs') and token_logprob.top_logprobs:
+                            out(f"    🔄 Alternativas:")
+                            for j, alt in enumerate(token_logprob.top_logprobs[:3]):
+                                alt_token = getattr(alt, 'token', 'N/A')
+                                alt_logprob = getattr(alt, 'logprob', 0.0)
+                                out(f"      {j+1}. '{alt_token}': {alt_logprob:.4f}")
+                    
+                    # Soma de todos os tokens da resposta em uma única passada (fsum: sem erro acumulado)
+                    token_logprobs = [getattr(t, 'logprob', 0.0) for t in logprobs.content]
+                    total_logprob = math.fsum(token_logprobs)
                     
                     # CALCULAR NLL
                     if token_details:
                         nll = -total_logprob
-                        perplexity = math.exp(nll / len(token_details))
+                        perplexity = math.exp(nll / len(token_logprobs))
                         
                         result.update({
                             "nll_calculable": True,
@@ -188,17 +338,17 @@ class GroqSpecificModelTester:
                             "logprobs_response_text": choice.message.content
                         })
                         
-                        print(f"\n📊 MÉTRICAS CALCULADAS:")
-                        print(f"    ✅ NLL: {nll:.4f}")
-                        print(f"    ✅ Perplexity: {perplexity:.4f}")
-                        print(f"    ✅ Tokens analisados: {len(logprobs.content)}")
-                        print(f"    ✅ Total logprob: {total_logprob:.4f}")
+                        out(f"\n📊 MÉTRICAS CALCULADAS:")
+                        out(f"    ✅ NLL: {nll:.4f}")
+                        out(f"    ✅ Perplexity: {perplexity:.4f}")
+                        out(f"    ✅ Tokens analisados: {len(logprobs.content)}")
+                        out(f"    ✅ Total logprob: {total_logprob:.4f}")
                 
             else:
-                print("❌ Logprobs não encontrados na resposta")
+                out("❌ Logprobs não encontrados na resposta")
                 
         except Exception as e:
-            print(f"❌ Logprobs NÃO suportados: {e}")
+            out(f"❌ Logprobs NÃO suportados: {e}")
             result["logprobs_error"] = str(e)
         
         return result
@@ -209,18 +359,55 @@ class GroqSpecificModelTester:
         self.print_section("TESTE DE MODELOS GROQ ESPECÍFICOS")
         
         print(f"🎯 Testando {len(self.models_to_test)} modelos para acesso aos logs NLL")
-        print(f"📝 Prompt de teste: {self.test_prompt}")
-        
-        results = []
+        print(f"📝 {len(self.test_prompts)} prompts de teste alternados entre os modelos")
+        
+        # Prompt fixo por posição do modelo na lista (estável mesmo com modelos ignorados)
+        prompts = dict(zip(self.models_to_test, itertools.cycle(self.test_prompts)))
+        
+        # Pular modelos que falharam dentro do cooldown
+        now = time.time()
+        models = []
+        skipped = {}
+        for model in self.models_to_test:
+            if now - self._deadlist.get(model, 0) > self.deadlist_cooldown_s:
+                models.append(model)
+            else:
+                skipped[model] = {
+                    "model": model,
+                    "prompt": prompts[model],
+                    "status": "error",
+                    "error": f"Ignorado: falhou há {(now - self._deadlist[model]) / 60:.0f} min (cooldown)"
+                }
+                print(f"⏭️ Ignorando {model}: falha recente")
+        
+        # Modelos testados em paralelo, limitados pelo semáforo
+        sem = asyncio.Semaphore(self.max_concurrency)
+        
+        async def bounded(model_name: str) -> Dict[str, Any]:
+            async with sem:
+                return await self.test_model_comprehensive(model_name, prompts[model_name])
+        
+        results = await asyncio.gather(
+            *(bounded(m) for m in models),
+            return_exceptions=True
+        )
+        
+        # Falha inesperada vira resultado de erro, como no teste individual
+        by_model = dict(skipped)
+        for model, r in zip(models, results):
+            if isinstance(r, BaseException):
+                self._deadlist[model] = time.time()
+                r = {"model": model, "prompt": prompts[model], "status": "error", "error": str(r)}
+            else:
+                r["cached"] = model in self._cache_hits
+                if r["status"] != "error":
+                    self._deadlist.pop(model, None)
+            by_model[model] = r
         
-        for model_name in self.models_to_test:
-            result = await self.test_model_comprehensive(model_name)
-            results.append(result)
-            
-            # Pausa entre testes para não sobrecarregar a API
-            await asyncio.sleep(1)
+        self._save_deadlist()
         
-        return results
+        # Resultados na ordem original dos modelos
+        return [by_model[m] for m in self.models_to_test]
     
     def analyze_results(self, results: List[Dict[str, Any]]):
         """Analisar e apresentar resultados finais"""
@@ -240,6 +427,8 @@ class GroqSpecificModelTester:
             status = result["status"]
             
             print(f"🤖 {model}:")
+            if result.get("cached"):
+                print(f"   💾 Resultado do cache (sem chamada de rede; GROQ_PROBE_CACHE=0 para testar de novo)")
             
             if status == "success":
                 print(f"   ✅ Status: TOTALMENTE FUNCIONAL")
@@ -249,6 +438,7 @@ class GroqSpecificModelTester:
                 print(f"   📊 NLL: {result['nll_value']:.4f}")
                 print(f"   📊 Perplexity: {result['perplexity']:.4f}")
                 print(f"   📊 Tokens: {result['token_count']}")
+                print(f"   📝 Prompt: {result['prompt']}")
                 
                 working_models.append(model)
                 logprobs_models.append(model)
@@ -286,7 +476,8 @@ class GroqSpecificModelTester:
         
         if nll_models:
             print(f"🏆 MODELOS RECOMENDADOS PARA NLL:")
-            # Ordenar por melhor NLL (menor valor)
+            # Ordenar por melhor NLL (menor valor); só comparável entre modelos com o mesmo prompt
+            print(f"   (cada modelo respondeu a um prompt diferente: compare NLL com cautela)")
             for model, nll_value in sorted(nll_models, key=lambda x: x[1]):
                 print(f"   ⭐ {model}: NLL = {nll_value:.4f}")
         else:
@@ -324,7 +515,10 @@ class GroqSpecificModelTester:
         print("Verificando acesso aos logs para cálculo de Negative Log Likelihood")
         
         # Testar todos os modelos
-        results = await self.test_all_models()
+        try:
+            results = await self.test_all_models()
+        finally:
+            self.close()
         
         # Analisar resultados
         summary = self.analyze_results(results)
@@ -332,7 +526,7 @@ class GroqSpecificModelTester:
         # Salvar resultados detalhados
         output_data = {
             "test_info": {
-                "prompt": self.test_prompt,
+                "prompts": self.test_prompts,
                 "models_tested": self.models_to_test,
                 "timestamp": "2024-12-19"
             },
@@ -126,7 +126,7 @@ class ConversationSimulator:
         print(f"   👤 Simulando conversa com {user.name} ({user.profile})")
         
         conversation_log = []
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Gerar perguntas para o usuário
         questions = user.generate_questions()
@@ -136,7 +136,7 @@ class ConversationSimulator:
         agent_sequence = ["search_agent", "property_agent", "scheduling_agent"]
         
         for i, question in enumerate(selected_questions):
-            question_start = time.time()
+            question_start = time.perf_counter()
             
             # Determinar qual agente responder
             agent_type = agent_sequence[i % len(agent_sequence)]
@@ -158,7 +158,7 @@ class ConversationSimulator:
                 
                 # Gerar resposta
                 response = await agent.generate_response(question, context)
-                response_time = time.time() - question_start
+                response_time = time.perf_counter() - question_start
                 
                 conversation_log.append({
                     "question": question,
@@ -176,12 +176,12 @@ class ConversationSimulator:
                     "question": question,
                     "agent_type": agent_type,
                     "response": f"Error: {str(e)}",
-                    "response_time": time.time() - question_start,
+                    "response_time": time.perf_counter() - question_start,
                     "success": False,
                     "error": str(e)
                 })
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         successful_responses = sum(1 for log in conversation_log if log["success"])
         
         return {
@@ -254,7 +254,7 @@ class StressTester:
         print(f"   • Perguntas por usuário: {questions_per_user}")
         print(f"   • Total de usuários disponíveis: {len(self.virtual_users)}")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Selecionar usuários para o teste
         test_users = random.sample(self.virtual_users, min(concurrent_users, len(self.virtual_users)))
@@ -268,7 +268,7 @@ class StressTester:
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         
         # Processar resultados
         successful_results = [r for r in results if not isinstance(r, Exception)]
@@ -4,19 +4,58 @@ Sistema para capturar, validar e analisar fluxos de conversação entre agentes
 """
 
 import asyncio
+import bisect
+import functools
 import pytest
 import json
+import random
+import re
 import time
+from collections import Counter
 from typing import List, Dict, Any, Optional, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
-from pydantic_ai import Agent, capture_run_messages
+from pydantic_ai import Agent
 from pydantic_ai.models.test import TestModel
 from pydantic_ai.models.function import FunctionModel, AgentInfo
 from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart
 
+# Palavras-chave dos hooks padrão (comparadas contra os tokens do evento)
+# Inclui as flexões usuais, já que a comparação é por token e não por substring
+PRICE_KEYWORDS = frozenset({
+    "price", "prices", "priced", "pricing", "cost", "costs", "costly",
+    "rent", "rents", "rental", "rentals", "budget", "budgets", "$",
+})
+SCHEDULING_KEYWORDS = frozenset({
+    "schedule", "schedules", "scheduled", "scheduling", "appointment", "appointments",
+    "viewing", "viewings", "visit", "visits", "visiting", "tour", "tours",
+})
+ERROR_KEYWORDS = frozenset({
+    "error", "errors", "sorry", "problem", "problems", "issue", "issues", "unavailable",
+})
+_TOKEN_RE = re.compile(r"[a-z$]+")
+# Índice único palavra-chave -> categoria de hook (erros só valem na resposta do agente)
+_INPUT_KEYWORD_CATEGORY = {
+    **{kw: "price" for kw in PRICE_KEYWORDS},
+    **{kw: "scheduling" for kw in SCHEDULING_KEYWORDS},
+}
+_RESPONSE_KEYWORD_CATEGORY = {**_INPUT_KEYWORD_CATEGORY, **{kw: "error" for kw in ERROR_KEYWORDS}}
+SLOW_RESPONSE_THRESHOLD = 5.0
+
+def _memoize_by_version(method):
+    """Memoiza análises do ConversationAnalyzer até o próximo evento/fluxo (self._version)"""
+    @functools.wraps(method)
+    def wrapper(self):
+        cached = self._analysis_cache.get(method.__name__)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        result = method(self)
+        self._analysis_cache[method.__name__] = (self._version, result)
+        return result
+    return wrapper
+
 class ConversationPhase(Enum):
     """Fases da conversa imobiliária"""
     GREETING = "greeting"
@@ -31,7 +70,7 @@ class AgentType(Enum):
     PROPERTY_AGENT = "property_agent"
     SCHEDULING_AGENT = "scheduling_agent"
 
-@dataclass
+@dataclass(slots=True)
 class ConversationEvent:
     """Evento de conversa capturado"""
     timestamp: datetime
@@ -43,7 +82,7 @@ class ConversationEvent:
     context: Dict[str, Any] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class ConversationFlow:
     """Fluxo completo de conversa"""
     session_id: str
@@ -52,15 +91,26 @@ class ConversationFlow:
     start_time: datetime = field(default_factory=datetime.now)
     end_time: Optional[datetime] = None
     total_duration: float = 0.0
+    # Relógio monotônico para a duração (start_time/end_time ficam para relatório)
+    start_mono: float = field(default_factory=time.monotonic)
+    # Agregados por fluxo, atualizados em add_event (métricas sem reescanear events)
+    rt_sum: float = 0.0
+    phases_seen: set = field(default_factory=set)
+    agents_seen: set = field(default_factory=set)
+    # Log único de mensagens da conversa; eventos guardam só o intervalo (msg_range)
+    messages_log: List[Any] = field(default_factory=list)
     agent_transitions: List[Dict[str, Any]] = field(default_factory=list)
     success_metrics: Dict[str, Any] = field(default_factory=dict)
 
 class ConversationHook:
     """Hook para capturar eventos de conversa"""
     
-    def __init__(self, name: str, trigger_condition: Callable[[ConversationEvent], bool]):
+    def __init__(self, name: str, trigger_condition: Callable[[ConversationEvent], bool],
+                 category: str = "always"):
         self.name = name
         self.trigger_condition = trigger_condition
+        # Categoria usada pelo analisador para só avaliar hooks relevantes ao evento
+        self.category = category
         self.captured_events: List[ConversationEvent] = []
         self.is_active = True
     
@@ -72,7 +122,11 @@ class ConversationHook:
         return False
     
     def get_captured_events(self) -> List[ConversationEvent]:
-        """Retorna eventos capturados"""
+        """Retorna eventos capturados (lista viva, não modificar; use snapshot() para uma cópia)"""
+        return self.captured_events
+    
+    def snapshot(self) -> List[ConversationEvent]:
+        """Retorna cópia isolada dos eventos capturados"""
         return self.captured_events.copy()
     
     def reset(self):
@@ -85,11 +139,26 @@ class ConversationAnalyzer:
     def __init__(self):
         self.flows: List[ConversationFlow] = []
         self.hooks: List[ConversationHook] = []
+        self._hooks_by_cat: Dict[str, List[ConversationHook]] = {}
         self.patterns: Dict[str, Any] = {}
+        # Evento anterior do fluxo em que add_event está operando (para os hooks)
+        self._previous_event: Optional[ConversationEvent] = None
+        # Tokens do evento corrente, calculados uma vez em add_event
+        self._response_tokens: frozenset = frozenset()
+        self._event_tokens: frozenset = frozenset()
+        self._keyword_categories: set = set()
+        # Cache das análises; invalidado quando _version muda
+        self._version = 0
+        self._analysis_cache: Dict[str, Any] = {}
+        # Agregados mantidos incrementalmente em add_event
+        self._transition_counter: Counter = Counter()
+        self._rt_sorted: List[float] = []
+        self._rt_sum = 0.0
     
     def add_hook(self, hook: ConversationHook):
         """Adiciona hook de captura"""
         self.hooks.append(hook)
+        self._hooks_by_cat.setdefault(hook.category, []).append(hook)
     
     def create_standard_hooks(self) -> List[ConversationHook]:
         """Cria hooks padrão para análise"""
@@ -97,35 +166,36 @@ class ConversationAnalyzer:
             # Hook para capturar transições de agente
             ConversationHook(
                 "agent_transitions",
-                lambda event: len(self.flows) > 0 and len(self.flows[-1].events) > 0 and 
-                self.flows[-1].events[-1].agent_type != event.agent_type
+                self._trg_agent_transition,
+                category="transition"
             ),
             
             # Hook para capturar respostas lentas
             ConversationHook(
                 "slow_responses",
-                lambda event: event.response_time > 5.0
+                self._trg_slow,
+                category="slow"
             ),
             
             # Hook para capturar menções de preço
             ConversationHook(
                 "price_discussions",
-                lambda event: any(word in event.user_input.lower() or word in event.agent_response.lower() 
-                                for word in ["price", "cost", "rent", "budget", "$"])
+                self._trg_price,
+                category="price"
             ),
             
             # Hook para capturar agendamentos
             ConversationHook(
                 "scheduling_requests",
-                lambda event: any(word in event.user_input.lower() or word in event.agent_response.lower() 
-                                for word in ["schedule", "appointment", "viewing", "visit", "tour"])
+                self._trg_scheduling,
+                category="scheduling"
             ),
             
             # Hook para capturar problemas/erros
             ConversationHook(
                 "error_responses",
-                lambda event: any(word in event.agent_response.lower() 
-                                for word in ["error", "sorry", "problem", "issue", "unavailable"])
+                self._trg_error,
+                category="error"
             )
         ]
         
@@ -134,6 +204,23 @@ class ConversationAnalyzer:
         
         return hooks
     
+    # Condições dos hooks padrão (métodos em vez de lambdas; hooks do usuário
+    # continuam aceitando qualquer callable)
+    def _trg_agent_transition(self, event: ConversationEvent) -> bool:
+        return self._previous_event is not None and self._previous_event.agent_type != event.agent_type
+    
+    def _trg_slow(self, event: ConversationEvent) -> bool:
+        return event.response_time > SLOW_RESPONSE_THRESHOLD
+    
+    def _trg_price(self, event: ConversationEvent) -> bool:
+        return not PRICE_KEYWORDS.isdisjoint(self._event_tokens)
+    
+    def _trg_scheduling(self, event: ConversationEvent) -> bool:
+        return not SCHEDULING_KEYWORDS.isdisjoint(self._event_tokens)
+    
+    def _trg_error(self, event: ConversationEvent) -> bool:
+        return not ERROR_KEYWORDS.isdisjoint(self._response_tokens)
+    
     def start_conversation_flow(self, session_id: str, user_profile: str) -> ConversationFlow:
         """Inicia novo fluxo de conversa"""
         flow = ConversationFlow(
@@ -142,15 +229,27 @@ class ConversationAnalyzer:
             start_time=datetime.now()
         )
         self.flows.append(flow)
+        self._version += 1
         return flow
     
-    def add_event(self, event: ConversationEvent):
-        """Adiciona evento ao fluxo atual"""
-        if not self.flows:
-            self.start_conversation_flow("default", "unknown")
+    def add_event(self, event: ConversationEvent, flow: Optional[ConversationFlow] = None):
+        """Adiciona evento ao fluxo informado (ou ao fluxo atual)
         
-        current_flow = self.flows[-1]
+        Passar o fluxo explicitamente permite simular várias conversas em
+        paralelo sem misturar eventos via self.flows[-1].
+        """
+        if flow is None:
+            if not self.flows:
+                self.start_conversation_flow("default", "unknown")
+            flow = self.flows[-1]
+        
+        current_flow = flow
+        self._previous_event = current_flow.events[-1] if current_flow.events else None
         current_flow.events.append(event)
+        current_flow.rt_sum += event.response_time
+        current_flow.phases_seen.add(event.phase)
+        current_flow.agents_seen.add(event.agent_type)
+        self._version += 1
         
         # Verificar transições de agente
         if len(current_flow.events) > 1:
@@ -165,19 +264,50 @@ class ConversationAnalyzer:
                     "trigger": event.user_input
                 }
                 current_flow.agent_transitions.append(transition)
+                self._transition_counter[f"{previous_agent.value} -> {current_agent.value}"] += 1
         
-        # Aplicar hooks
-        for hook in self.hooks:
-            hook.capture(event)
-    
-    def end_conversation_flow(self) -> Optional[ConversationFlow]:
-        """Finaliza fluxo atual"""
-        if not self.flows:
-            return None
+        bisect.insort(self._rt_sorted, event.response_time)
+        self._rt_sum += event.response_time
+        
+        # Tokenizar uma vez por evento (lower + findall) para todos os hooks
+        input_tokens = frozenset(_TOKEN_RE.findall(event.user_input.lower()))
+        self._response_tokens = frozenset(_TOKEN_RE.findall(event.agent_response.lower()))
+        self._event_tokens = self._response_tokens | input_tokens
+        
+        # Uma passada pelos tokens resolve todas as categorias de palavras-chave
+        self._keyword_categories = {
+            _RESPONSE_KEYWORD_CATEGORY[t] for t in self._response_tokens if t in _RESPONSE_KEYWORD_CATEGORY
+        }
+        self._keyword_categories.update(
+            _INPUT_KEYWORD_CATEGORY[t] for t in input_tokens if t in _INPUT_KEYWORD_CATEGORY
+        )
+        
+        # Aplicar só os hooks das categorias relevantes para este evento
+        for category in self._event_categories(event):
+            for hook in self._hooks_by_cat.get(category, ()):
+                hook.capture(event)
+    
+    def _event_categories(self, event: ConversationEvent) -> List[str]:
+        """Categorias de hooks a avaliar para o evento (hooks sem categoria: "always")"""
+        categories = ["always"]
+        previous = self._previous_event
+        if previous is not None and previous.agent_type != event.agent_type:
+            categories.append("transition")
+        if event.response_time > SLOW_RESPONSE_THRESHOLD:
+            categories.append("slow")
+        categories.extend(self._keyword_categories)
+        return categories
+    
+    def end_conversation_flow(self, flow: Optional[ConversationFlow] = None) -> Optional[ConversationFlow]:
+        """Finaliza o fluxo informado (ou o fluxo atual)"""
+        if flow is None:
+            if not self.flows:
+                return None
+            flow = self.flows[-1]
         
-        flow = self.flows[-1]
         flow.end_time = datetime.now()
-        flow.total_duration = (flow.end_time - flow.start_time).total_seconds()
+        flow.total_duration = time.monotonic() - flow.start_mono
+        self._version += 1
         
         # Calcular métricas de sucesso
         flow.success_metrics = self._calculate_success_metrics(flow)
@@ -189,9 +319,9 @@ class ConversationAnalyzer:
         metrics = {
             "total_interactions": len(flow.events),
             "agent_transitions": len(flow.agent_transitions),
-            "average_response_time": sum(e.response_time for e in flow.events) / len(flow.events) if flow.events else 0,
-            "phases_covered": len(set(e.phase for e in flow.events)),
-            "agents_used": len(set(e.agent_type for e in flow.events)),
+            "average_response_time": flow.rt_sum / len(flow.events) if flow.events else 0,
+            "phases_covered": len(flow.phases_seen),
+            "agents_used": len(flow.agents_seen),
             "conversation_quality": "unknown"
         }
         
@@ -213,71 +343,64 @@ class ConversationAnalyzer:
         if not self.flows:
             return {"error": "No conversation flows to analyze"}
         
-        analysis = {
+        # hook_summary fica fora do cache: hooks podem ser resetados externamente
+        analysis = dict(self._analyze_flows())
+        analysis["hook_summary"] = self._summarize_hooks()
+        
+        return analysis
+    
+    @_memoize_by_version
+    def _analyze_flows(self) -> Dict[str, Any]:
+        """Parte de analyze_patterns derivada apenas dos fluxos"""
+        return {
             "total_conversations": len(self.flows),
             "average_duration": sum(f.total_duration for f in self.flows) / len(self.flows),
             "common_agent_transitions": self._analyze_transitions(),
             "response_time_distribution": self._analyze_response_times(),
-            "phase_patterns": self._analyze_phase_patterns(),
-            "hook_summary": self._summarize_hooks()
+            "phase_patterns": self._analyze_phase_patterns()
         }
-        
-        return analysis
     
+    @_memoize_by_version
     def _analyze_transitions(self) -> Dict[str, int]:
         """Analisa transições mais comuns entre agentes"""
-        transitions = {}
-        for flow in self.flows:
-            for transition in flow.agent_transitions:
-                key = f"{transition['from']} -> {transition['to']}"
-                transitions[key] = transitions.get(key, 0) + 1
-        
-        return dict(sorted(transitions.items(), key=lambda x: x[1], reverse=True))
+        # Só as mais comuns (o relatório usa as 5 primeiras); seleção parcial via heap
+        return dict(self._transition_counter.most_common(10))
     
+    @_memoize_by_version
     def _analyze_response_times(self) -> Dict[str, float]:
         """Analisa distribuição de tempos de resposta"""
-        all_times = []
-        for flow in self.flows:
-            all_times.extend([e.response_time for e in flow.events])
+        all_times = self._rt_sorted  # já ordenado (bisect.insort em add_event)
         
         if not all_times:
             return {"error": "No response times to analyze"}
         
-        all_times.sort()
         n = len(all_times)
         
         return {
-            "min": min(all_times),
-            "max": max(all_times),
-            "average": sum(all_times) / n,
+            "min": all_times[0],
+            "max": all_times[-1],
+            "average": self._rt_sum / n,
             "median": all_times[n//2],
             "p95": all_times[int(n * 0.95)] if n > 0 else 0
         }
     
+    @_memoize_by_version
     def _analyze_phase_patterns(self) -> Dict[str, Any]:
         """Analisa padrões de fases da conversa"""
-        phase_sequences = []
-        for flow in self.flows:
-            sequence = [e.phase.value for e in flow.events]
-            phase_sequences.append(sequence)
+        # Tuplas como chave; o " -> ".join só é feito para o top 5
+        phase_sequences = [tuple(e.phase.value for e in flow.events) for flow in self.flows]
         
         # Encontrar sequências mais comuns
-        sequence_counts = {}
-        for seq in phase_sequences:
-            seq_str = " -> ".join(seq)
-            sequence_counts[seq_str] = sequence_counts.get(seq_str, 0) + 1
+        sequence_counts = Counter(phase_sequences)
         
         return {
-            "most_common_sequences": dict(sorted(sequence_counts.items(), key=lambda x: x[1], reverse=True)[:5]),
-            "average_phases_per_conversation": sum(len(seq) for seq in phase_sequences) / len(phase_sequences) if phase_sequences else 0
+            "most_common_sequences": {" -> ".join(seq): count for seq, count in sequence_counts.most_common(5)},
+            "average_phases_per_conversation": sum(map(len, phase_sequences)) / len(phase_sequences) if phase_sequences else 0
         }
     
     def _summarize_hooks(self) -> Dict[str, int]:
         """Resumo dos eventos capturados pelos hooks"""
-        summary = {}
-        for hook in self.hooks:
-            summary[hook.name] = len(hook.captured_events)
-        return summary
+        return {hook.name: len(hook.captured_events) for hook in self.hooks}
     
     def generate_conversation_report(self) -> str:
         """Gera relatório detalhado das conversas"""
@@ -344,23 +467,24 @@ class ConversationSimulator:
     def create_realistic_test_model(self) -> FunctionModel:
         """Cria modelo de teste realista"""
         
-        def realistic_response(messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        async def realistic_response(messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
             """Gera respostas realistas baseadas no contexto"""
             
-            # Simular delay realista
-            time.sleep(random.uniform(0.5, 2.0))
+            # Simular delay realista sem bloquear o event loop
+            await asyncio.sleep(random.uniform(0.5, 2.0))
             
-            # Obter mensagem do usuário
+            # Obter mensagem do usuário (já em minúsculas, uma vez por chamada)
             user_message = messages[-1].parts[-1].content if messages and messages[-1].parts else "Hello"
+            text = user_message.lower()
             
             # Gerar resposta contextual
-            if "hello" in user_message.lower() or "hi" in user_message.lower():
+            if "hello" in text or "hi" in text:
                 response = "Hello! I'm here to help you find the perfect property. What are you looking for?"
-            elif "bedroom" in user_message.lower():
+            elif "bedroom" in text:
                 response = "I can help you find properties with the number of bedrooms you need. What's your preferred location?"
-            elif "price" in user_message.lower() or "budget" in user_message.lower():
+            elif "price" in text or "budget" in text:
                 response = "I understand budget is important. Let me show you some properties in your price range."
-            elif "schedule" in user_message.lower() or "visit" in user_message.lower():
+            elif "schedule" in text or "visit" in text:
                 response = "I'd be happy to schedule a viewing for you. What days work best?"
             else:
                 response = "That's a great question! Let me provide you with the information you need."
@@ -373,7 +497,7 @@ class ConversationSimulator:
         """Simula conversa baseada em script"""
         
         # Iniciar fluxo
-        session_id = f"sim_{int(time.time())}"
+        session_id = f"sim_{user_profile}_{int(time.time())}"
         flow = self.analyzer.start_conversation_flow(session_id, user_profile)
         
         # Criar agente de teste
@@ -382,30 +506,33 @@ class ConversationSimulator:
         
         # Executar script de conversa
         for step in conversation_script:
-            start_time = time.time()
+            start_time = time.perf_counter()
             
-            # Executar interação
-            with capture_run_messages() as messages:
-                result = await agent.run(step["user_input"])
-                response_time = time.time() - start_time
-                
-                # Criar evento
-                event = ConversationEvent(
-                    timestamp=datetime.now(),
-                    agent_type=AgentType(step.get("agent_type", "search_agent")),
-                    phase=ConversationPhase(step.get("phase", "search_criteria")),
-                    user_input=step["user_input"],
-                    agent_response=str(result.data),
-                    response_time=response_time,
-                    context=step.get("context", {}),
-                    metadata={"messages": messages}
-                )
-                
-                # Adicionar evento ao fluxo
-                self.analyzer.add_event(event)
+            # Executar interação (new_messages() traz só as mensagens deste run)
+            result = await agent.run(step["user_input"])
+            response_time = time.perf_counter() - start_time
+            
+            # Mensagens vão para o log do fluxo: flow.messages_log[start:end]
+            msg_start = len(flow.messages_log)
+            flow.messages_log.extend(result.new_messages())
+            
+            # Criar evento
+            event = ConversationEvent(
+                timestamp=datetime.now(),
+                agent_type=AgentType(step.get("agent_type", "search_agent")),
+                phase=ConversationPhase(step.get("phase", "search_criteria")),
+                user_input=step["user_input"],
+                agent_response=str(result.data),
+                response_time=response_time,
+                context=step.get("context", {}),
+                metadata={"msg_range": (msg_start, len(flow.messages_log))}
+            )
+            
+            # Adicionar evento ao fluxo desta simulação
+            self.analyzer.add_event(event, flow)
         
         # Finalizar fluxo
-        return self.analyzer.end_conversation_flow()
+        return self.analyzer.end_conversation_flow(flow)
 
 # Testes pytest
 class TestConversationHooks:
@@ -537,6 +664,157 @@ class TestConversationHooks:
         assert "search_agent -> property_agent" in analysis["common_agent_transitions"]
         assert analysis["response_time_distribution"]["average"] == 1.5
 
+    @staticmethod
+    def _event(agent_type=AgentType.SEARCH_AGENT, user_input="Hello", agent_response="Hi!",
+               response_time=1.0, phase=ConversationPhase.GREETING) -> ConversationEvent:
+        return ConversationEvent(
+            timestamp=datetime.now(),
+            agent_type=agent_type,
+            phase=phase,
+            user_input=user_input,
+            agent_response=agent_response,
+            response_time=response_time
+        )
+
+    def test_analysis_cache_invalidated_by_add_event(self, analyzer):
+        """Análise memoizada é recalculada após add_event"""
+        analyzer.start_conversation_flow("test", "user")
+        analyzer.add_event(self._event(response_time=1.0))
+        first = analyzer.analyze_patterns()
+        assert analyzer.analyze_patterns()["response_time_distribution"] is first["response_time_distribution"]
+
+        analyzer.add_event(self._event(response_time=3.0))
+        second = analyzer.analyze_patterns()
+
+        assert second["response_time_distribution"]["average"] == 2.0
+        assert second["response_time_distribution"]["max"] == 3.0
+
+    def test_analysis_cache_invalidated_by_end_conversation_flow(self, analyzer):
+        """Análise memoizada é recalculada após end_conversation_flow"""
+        flow = analyzer.start_conversation_flow("test", "user")
+        analyzer.add_event(self._event())
+        before = analyzer._analyze_flows()
+        assert before["average_duration"] == 0.0
+
+        analyzer.end_conversation_flow(flow)
+        after = analyzer._analyze_flows()
+
+        assert after is not before
+        assert after["average_duration"] == flow.total_duration
+
+    def test_custom_hooks_fire_for_each_category(self, analyzer):
+        """Hooks do usuário continuam disparando em todas as categorias"""
+        custom = {
+            category: ConversationHook(f"custom_{category}", lambda e: True, category=category)
+            for category in ("always", "transition", "slow", "price", "scheduling", "error")
+        }
+        default_hook = ConversationHook("custom_default", lambda e: True)
+        for hook in (*custom.values(), default_hook):
+            analyzer.add_hook(hook)
+
+        analyzer.start_conversation_flow("test", "user")
+        events = [
+            self._event(),
+            self._event(agent_type=AgentType.PROPERTY_AGENT),
+            self._event(agent_type=AgentType.PROPERTY_AGENT, response_time=SLOW_RESPONSE_THRESHOLD + 1),
+            self._event(agent_type=AgentType.PROPERTY_AGENT, user_input="What is the price?"),
+            self._event(agent_type=AgentType.PROPERTY_AGENT, user_input="Can I schedule a tour?"),
+            self._event(agent_type=AgentType.PROPERTY_AGENT, agent_response="Sorry, an error occurred"),
+        ]
+        for event in events:
+            analyzer.add_event(event)
+
+        assert custom["always"].get_captured_events() == events
+        assert default_hook.get_captured_events() == events
+        assert custom["transition"].get_captured_events() == [events[1]]
+        assert custom["slow"].get_captured_events() == [events[2]]
+        assert custom["price"].get_captured_events() == [events[3]]
+        assert custom["scheduling"].get_captured_events() == [events[4]]
+        assert custom["error"].get_captured_events() == [events[5]]
+
+    @pytest.mark.parametrize("hook_name, user_input, agent_response", [
+        ("price_discussions", "Is the rental within my budget?", "Sure"),
+        ("price_discussions", "What are the monthly costs?", "Sure"),
+        ("scheduling_requests", "How many visits can I book?", "Sure"),
+        ("scheduling_requests", "Are tours scheduled on weekends?", "Sure"),
+        ("error_responses", "Hello", "We hit some issues, sorry"),
+    ])
+    def test_keyword_hooks_match_inflected_forms(self, analyzer, hook_name, user_input, agent_response):
+        """Hooks de palavras-chave casam as flexões comuns (comparação por token)"""
+        hook = next(h for h in analyzer.hooks if h.name == hook_name)
+        analyzer.start_conversation_flow("test", "user")
+
+        analyzer.add_event(self._event(user_input=user_input, agent_response=agent_response))
+
+        assert len(hook.get_captured_events()) == 1
+
+    def test_keyword_hooks_ignore_substrings(self, analyzer):
+        """Palavras que só contêm a palavra-chave (parent, visitor) não disparam hooks"""
+        analyzer.start_conversation_flow("test", "user")
+
+        analyzer.add_event(self._event(user_input="My parent is a visitor in Costa Rica"))
+
+        assert analyzer.analyze_patterns()["hook_summary"]["price_discussions"] == 0
+        assert analyzer.analyze_patterns()["hook_summary"]["scheduling_requests"] == 0
+
+    def test_agent_transitions_hook_fires_on_agent_change(self, analyzer):
+        """Hook agent_transitions só dispara quando o agente realmente muda"""
+        transitions_hook = next(h for h in analyzer.hooks if h.name == "agent_transitions")
+        analyzer.start_conversation_flow("test", "user")
+
+        analyzer.add_event(self._event(agent_type=AgentType.SEARCH_AGENT))
+        analyzer.add_event(self._event(agent_type=AgentType.SEARCH_AGENT))
+        assert transitions_hook.get_captured_events() == []
+
+        change = self._event(agent_type=AgentType.SCHEDULING_AGENT)
+        analyzer.add_event(change)
+
+        assert transitions_hook.get_captured_events() == [change]
+        assert analyzer.flows[0].agent_transitions[0]["to"] == AgentType.SCHEDULING_AGENT.value
+
+    @pytest.mark.asyncio
+    async def test_concurrent_simulations_do_not_mix_events(self, simulator, monkeypatch):
+        """Duas simulate_conversation concorrentes mantêm eventos nos próprios fluxos"""
+        # Sem delay artificial, mas ainda cedendo o loop entre as interações
+        monkeypatch.setattr(random, "uniform", lambda a, b: 0.0)
+        scripts = {
+            profile: [
+                {"user_input": f"{profile} message {i}", "agent_type": "search_agent", "phase": "search_criteria"}
+                for i in range(4)
+            ]
+            for profile in ("alice", "bob")
+        }
+
+        flows = await asyncio.gather(*[
+            simulator.simulate_conversation(profile, script) for profile, script in scripts.items()
+        ])
+
+        for flow, (profile, script) in zip(flows, scripts.items()):
+            assert flow.user_profile == profile
+            assert [e.user_input for e in flow.events] == [step["user_input"] for step in script]
+            ranges = [e.metadata["msg_range"] for e in flow.events]
+            assert ranges[0][0] == 0 and ranges[-1][1] == len(flow.messages_log)
+            assert all(prev[1] == cur[0] for prev, cur in zip(ranges, ranges[1:]))
+
+    def test_incremental_response_times_match_brute_force(self, analyzer):
+        """Média/mediana/p95 incrementais batem com o recálculo completo"""
+        rng = random.Random(42)
+        times = [rng.uniform(0.1, 8.0) for _ in range(57)]
+        for i, response_time in enumerate(times):
+            if i % 10 == 0:
+                analyzer.start_conversation_flow(f"session_{i}", "user")
+            analyzer.add_event(self._event(response_time=response_time))
+
+        distribution = analyzer.analyze_patterns()["response_time_distribution"]
+        expected = sorted(times)
+        n = len(expected)
+
+        assert distribution["min"] == expected[0]
+        assert distribution["max"] == expected[-1]
+        assert distribution["average"] == pytest.approx(sum(times) / n)
+        assert distribution["median"] == expected[n // 2]
+        assert distribution["p95"] == expected[int(n * 0.95)]
+
 # Função principal para demonstração
 async def main():
     """Demonstração do sistema de hooks"""
@@ -572,10 +850,13 @@ async def main():
     ]
     
     # Executar simulações
-    print("\n📝 Executando simulações de conversa...")
+    print("\n📝 Executando simulações de conversa (em paralelo)...")
     for i, script in enumerate(conversation_scripts, 1):
         print(f"   Conversa {i}: {len(script)} interações")
-        await simulator.simulate_conversation(f"user_profile_{i}", script)
+    await asyncio.gather(*[
+        simulator.simulate_conversation(f"user_profile_{i}", script)
+        for i, script in enumerate(conversation_scripts, 1)
+    ])
     
     # Gerar relatório
     print("\n📊 RELATÓRIO DE ANÁLISE:")
@@ -584,5 +865,4 @@ async def main():
     print("\n✅ Demonstração concluída!")
 
 if __name__ == "__main__":
-    import random
     asyncio.run(main()) 
\ No newline at end of file
@@ -199,13 +199,13 @@ class RealEstateStressTester:
         agent = Agent(test_model, deps_type=str)
         
         conversation_log = []
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Simular conversa
         selected_questions = random.sample(user.questions, min(num_questions, len(user.questions)))
         
         for i, question in enumerate(selected_questions):
-            question_start = time.time()
+            question_start = time.perf_counter()
             
             with capture_run_messages() as messages:
                 try:
@@ -214,7 +214,7 @@ class RealEstateStressTester:
                         await asyncio.sleep(random.uniform(0.5, 2.0))
                     
                     result = await agent.run(question)
-                    response_time = time.time() - question_start
+                    response_time = time.perf_counter() - question_start
                     
                     conversation_log.append({
                         "question": question,
@@ -228,12 +228,12 @@ class RealEstateStressTester:
                     conversation_log.append({
                         "question": question,
                         "response": f"Error: {str(e)}",
-                        "response_time": time.time() - question_start,
+                        "response_time": time.perf_counter() - question_start,
                         "success": False,
                         "error": str(e)
                     })
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         
         return {
             "user": user,
@@ -250,7 +250,7 @@ class RealEstateStressTester:
         print(f"🚀 Iniciando stress test com {concurrent_users} usuários simultâneos")
         print(f"📝 {questions_per_user} perguntas por usuário")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Selecionar usuários para o teste
         test_users = random.sample(self.virtual_users, min(concurrent_users, len(self.virtual_users)))
@@ -263,7 +263,7 @@ class RealEstateStressTester:
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         
         # Processar resultados
         successful_results = [r for r in results if not isinstance(r, Exception)]
@@ -1,24 +1,53 @@
 #!/usr/bin/env python3
 """
 Teste final do sistema agêntico com dados mock e real
+
+Os modos mock e real são casos independentes do mesmo teste parametrizado;
+para executá-los em paralelo (um worker por modo):
+
+    pytest -n 2 tests/system/test_final_system.py
 """
 
 import asyncio
+import logging
+import os
+import httpx
+import pytest
+import re
 import requests
-import json
-import time
+
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = "http://localhost:8000"
+
+_REAL_AGENT_RE = re.compile(r"\bEmma\b")
+
+def _is_real_agent(agent_response: dict) -> bool:
+    """Resposta veio do agente real (e não de respostas automáticas/mock)?"""
+    return bool(
+        _REAL_AGENT_RE.search(agent_response.get("agent_name") or "") and
+        len(agent_response.get("message") or "") > 50 and
+        (agent_response.get("confidence") or 0) > 0.5
+    )
 
 def test_api_health():
     """Testa se o API está funcionando"""
     try:
-        response = requests.get("http://localhost:8000/api/health", timeout=5)
+        response = requests.get(f"{API_BASE_URL}/api/health", timeout=5)
         print(f"✅ API Health: {response.status_code} - {response.json()}")
         return True
     except Exception as e:
         print(f"❌ API Health failed: {e}")
         return False
 
-def test_agentic_session_with_data_mode(data_mode: str):
+@pytest.mark.integration
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("mode", ["mock", "real"])
+async def test_agentic_session(mode, client):
+    """Sessão agêntica deve ser atendida pelo agente real em cada modo de dados"""
+    assert await run_agentic_session(client, mode)
+
+async def run_agentic_session(client: httpx.AsyncClient, data_mode: str) -> bool:
     """Testa sessão agêntica com modo de dados específico"""
     print(f"\n{'='*60}")
     print(f"🧪 TESTANDO SISTEMA AGÊNTICO COM DADOS {data_mode.upper()}")
@@ -34,15 +63,15 @@ def test_agentic_session_with_data_mode(data_mode: str):
             "language": "en"
         }
         
-        session_response = requests.post(
-            f"http://localhost:8000/api/agent/session/start?mode={data_mode}",
+        session_response = await client.post(
+            f"/api/agent/session/start?mode={data_mode}",
             json=session_data,
             timeout=10
         )
         
         print(f"   Status: {session_response.status_code}")
         session_result = session_response.json()
-        print(f"   Response: {json.dumps(session_result, indent=2)}")
+        logger.debug("   Response: %s", session_result)
         
         if not session_result.get('success'):
             print(f"❌ Falha ao criar sessão: {session_result.get('message')}")
@@ -58,15 +87,15 @@ def test_agentic_session_with_data_mode(data_mode: str):
             "session_id": session_id
         }
         
-        message_response = requests.post(
-            f"http://localhost:8000/api/agent/chat?mode={data_mode}",
+        message_response = await client.post(
+            f"/api/agent/chat?mode={data_mode}",
             json=message_data,
             timeout=30
         )
         
         print(f"   Status: {message_response.status_code}")
         message_result = message_response.json()
-        print(f"   Response: {json.dumps(message_result, indent=2)}")
+        logger.debug("   Response: %s", message_result)
         
         if not message_result.get('success'):
             print(f"❌ Falha ao enviar mensagem: {message_result.get('message')}")
@@ -83,11 +112,7 @@ def test_agentic_session_with_data_mode(data_mode: str):
         agent_name = agent_response.get('agent_name', '')
         
         # Verificar se não são respostas automáticas/mock
-        is_real_agent = (
-            'Emma' in agent_name and 
-            len(message_content) > 50 and
-            agent_response.get('confidence', 0) > 0.5
-        )
+        is_real_agent = _is_real_agent(agent_response)
         
         if is_real_agent:
             print(f"✅ 3. SISTEMA AGÊNTICO FUNCIONANDO com dados {data_mode.upper()}!")
@@ -106,24 +131,25 @@ def test_agentic_session_with_data_mode(data_mode: str):
         print(f"❌ Erro no teste: {e}")
         return False
 
-def main():
+async def main():
     print("🚀 TESTE FINAL DO SISTEMA AGÊNTICO")
     print("=" * 60)
     
     # Aguardar servidor inicializar
     print("⏳ Aguardando servidor inicializar...")
-    time.sleep(3)
+    await asyncio.sleep(3)
     
     # 1. Testar saúde da API
     if not test_api_health():
         print("❌ API não está funcionando. Verifique se o servidor está rodando.")
         return
     
-    # 2. Testar com dados mock (Demo Mode)
-    mock_success = test_agentic_session_with_data_mode('mock')
-    
-    # 3. Testar com dados reais
-    real_success = test_agentic_session_with_data_mode('real')
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=30.0) as client:
+        # 2. Testar com dados mock (Demo Mode)
+        mock_success = await run_agentic_session(client, 'mock')
+        
+        # 3. Testar com dados reais
+        real_success = await run_agentic_session(client, 'real')
     
     # 4. Resumo final
     print(f"\n{'='*60}")
@@ -145,4 +171,10 @@ def main():
         print(f"\n❌ FALHA TOTAL: Sistema ainda usando respostas automáticas")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    logging.basicConfig(level=os.getenv("OBS_LOG_LEVEL", "INFO").upper(), format="%(message)s")
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(main()) 
\ No newline at end of file
@@ -165,5 +165,10 @@ async def main():
         return False
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -74,4 +74,9 @@ async def test_graph_execution():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(test_graph_execution()) 
\ No newline at end of file
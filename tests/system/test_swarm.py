@@ -3,8 +3,25 @@ Testes para o orquestrador LangGraph-Swarm.
 """
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock
-from app.orchestration.swarm import SwarmOrchestrator, SwarmState
+from app.orchestration.swarm import (
+    HANDOFF_HISTORY_MAXLEN,
+    Handoff,
+    SwarmOrchestrator,
+    SwarmState,
+    append_handoffs,
+)
+
+
+FIXED_RESPONSE = {
+    "messages": [
+        {"role": "assistant", "content": "Olá! Como posso ajudá-lo?"}
+    ]
+}
+
+
+async def _ainvoke_stub(*args, **kwargs):
+    """Stub leve do grafo: só o valor de retorno importa nestes testes."""
+    return FIXED_RESPONSE
 
 
 class TestSwarmOrchestrator:
@@ -31,11 +48,7 @@ class TestSwarmOrchestrator:
         }
         
         # Mock do grafo para evitar execução real
-        orchestrator.graph.ainvoke = AsyncMock(return_value={
-            "messages": [
-                {"role": "assistant", "content": "Olá! Como posso ajudá-lo?"}
-            ]
-        })
+        orchestrator.graph.ainvoke = _ainvoke_stub
         
         result = await orchestrator.process_message(message)
         
@@ -85,8 +98,29 @@ class TestSwarmState:
         """Testar contexto do estado."""
         state = SwarmState(
             context={"test_key": "test_value"},
-            handoff_history=[{"from": "search", "to": "property"}]
+            handoff_history=[Handoff("search", "property", 0.0)]
         )
         
         assert state.context["test_key"] == "test_value"
-        assert len(state.handoff_history) == 1 
\ No newline at end of file
+        assert len(state.handoff_history) == 1
+    
+    def test_handoff_history_append_only(self):
+        """Testar reducer append-only do histórico de handoffs."""
+        history = append_handoffs(None, Handoff("search_agent", "property_agent", 1.0))
+        updated = append_handoffs(history, [Handoff("property_agent", "scheduling_agent", 2.0)])
+        
+        # Reducer puro: o estado anterior (possivelmente checkpointado) não muda
+        assert updated is not history
+        assert [h.to_agent for h in history] == ["property_agent"]
+        assert [h.to_agent for h in updated] == ["property_agent", "scheduling_agent"]
+        
+        for i in range(HANDOFF_HISTORY_MAXLEN + 10):
+            updated = append_handoffs(updated, Handoff("a", "b", float(i)))
+        assert len(updated) == HANDOFF_HISTORY_MAXLEN
+        assert updated[-1].ts == float(HANDOFF_HISTORY_MAXLEN + 9)
+    
+    def test_handoff_history_accepts_dict_entries(self):
+        """Testar conversão de entradas legadas em dict para Handoff."""
+        history = append_handoffs([{"from": "search", "to": "property"}], {"from": "property", "to": "scheduling", "ts": 3.0})
+        
+        assert list(history) == [Handoff("search", "property", 0.0), Handoff("property", "scheduling", 3.0)]
@@ -81,4 +81,9 @@ async def test_swarm_orchestrator():
         return False
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(test_swarm_orchestrator()) 
\ No newline at end of file
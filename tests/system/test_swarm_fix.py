@@ -2,6 +2,9 @@
 """Test script to validate SwarmOrchestrator property context usage"""
 
 import asyncio
+import logging
+import pytest
+import re
 import sys
 import os
 
@@ -10,33 +13,63 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.orchestration.swarm import SwarmOrchestrator
 
-async def test_swarm_with_mock_property():
+logger = logging.getLogger(__name__)
+
+# Mock property data (similar to what comes from API) - shared, never mutated
+_MOCK_PROPERTY = {
+    'id': '1',
+    'formattedAddress': '123 Main St, Miami, FL 33101',
+    'price': 450000,
+    'bedrooms': 3,
+    'bathrooms': 2,
+    'squareFootage': 1500,
+    'yearBuilt': 2020,
+    'propertyType': 'Condo',
+    'city': 'Miami',
+    'state': 'FL'
+}
+
+# Real property data (from RentCast API format) - shared, never mutated
+_REAL_PROPERTY = {
+    'id': '1050-Brickell-Ave,-Apt-3504,-Miami,-FL-33131',
+    'formattedAddress': '1050 Brickell Ave, Apt 3504, Miami, FL 33131',
+    'price': 850000,
+    'bedrooms': 2,
+    'bathrooms': 2,
+    'squareFootage': 1200,
+    'yearBuilt': 2018,
+    'propertyType': 'Apartment',
+    'city': 'Miami',
+    'state': 'FL'
+}
+
+# Validações de resposta compiladas uma única vez (uma varredura por resposta)
+_MOCK_OK = re.compile(r"Miami.*\$450,000|\$450,000.*Miami", re.S)
+_REAL_OK = re.compile(r"Brickell.*\$850,000|\$850,000.*Brickell", re.S)
+_BRAZILIAN_DATA = re.compile(r"Copacabana|R\$")
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_swarm_with_mock_property(orchestrator):
+    """Response must use the MOCK property context"""
+    assert await check_swarm_with_mock_property(orchestrator)
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_swarm_with_real_property(orchestrator):
+    """Response must use the REAL property context"""
+    assert await check_swarm_with_real_property(orchestrator)
+
+async def check_swarm_with_mock_property(orchestrator: SwarmOrchestrator):
     """Test SwarmOrchestrator with mock property context"""
     
     print("🧪 Testing SwarmOrchestrator with MOCK property context...")
     
-    # Mock property data (similar to what comes from API)
-    mock_property = {
-        'id': '1',
-        'formattedAddress': '123 Main St, Miami, FL 33101',
-        'price': 450000,
-        'bedrooms': 3,
-        'bathrooms': 2,
-        'squareFootage': 1500,
-        'yearBuilt': 2020,
-        'propertyType': 'Condo',
-        'city': 'Miami',
-        'state': 'FL'
-    }
-    
-    # Initialize orchestrator
-    orchestrator = SwarmOrchestrator()
-    
     # Create message with property context
     message = {
         'messages': [{'role': 'user', 'content': 'Tell me about this property'}],
         'context': {
-            'property_context': mock_property,
+            'property_context': _MOCK_PROPERTY,
             'data_mode': 'mock'
         }
     }
@@ -64,9 +97,10 @@ async def test_swarm_with_mock_property():
                 print(f"🎯 Full Response:\n{response_content}")
                 
                 # Check if response contains property data
-                if 'Miami' in response_content and '$450,000' in response_content:
+                if _MOCK_OK.search(response_content):
                     print("✅ SUCCESS: Response contains correct MOCK property data!")
-                elif 'Copacabana' in response_content or 'R$' in response_content:
+                    return True
+                elif _BRAZILIAN_DATA.search(response_content):
                     print("❌ FAILED: Response still contains Brazilian hardcoded data!")
                 else:
                     print("⚠️  WARNING: Response doesn't contain expected property data")
@@ -79,38 +113,21 @@ async def test_swarm_with_mock_property():
             print(f"📄 Full result: {result}")
             
     except Exception as e:
-        print(f"❌ Error during test: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error during test: %s", e)
+    
+    return False
 
-async def test_swarm_with_real_property():
+async def check_swarm_with_real_property(orchestrator: SwarmOrchestrator):
     """Test SwarmOrchestrator with real property context"""
     
     print("\n" + "="*60)
     print("🧪 Testing SwarmOrchestrator with REAL property context...")
     
-    # Real property data (from RentCast API format)
-    real_property = {
-        'id': '1050-Brickell-Ave,-Apt-3504,-Miami,-FL-33131',
-        'formattedAddress': '1050 Brickell Ave, Apt 3504, Miami, FL 33131',
-        'price': 850000,
-        'bedrooms': 2,
-        'bathrooms': 2,
-        'squareFootage': 1200,
-        'yearBuilt': 2018,
-        'propertyType': 'Apartment',
-        'city': 'Miami',
-        'state': 'FL'
-    }
-    
-    # Initialize orchestrator
-    orchestrator = SwarmOrchestrator()
-    
     # Create message with property context
     message = {
         'messages': [{'role': 'user', 'content': 'I want to schedule a visit for this property'}],
         'context': {
-            'property_context': real_property,
+            'property_context': _REAL_PROPERTY,
             'data_mode': 'real'
         }
     }
@@ -135,20 +152,27 @@ async def test_swarm_with_real_property():
             print(f"🎯 Full Response:\n{response_content}")
             
             # Check if response contains correct property data
-            if 'Brickell' in response_content and '$850,000' in response_content:
+            if _REAL_OK.search(response_content):
                 print("✅ SUCCESS: Response contains correct REAL property data!")
+                return True
             elif 'Copacabana' in response_content:
                 print("❌ FAILED: Response still contains Brazilian hardcoded data!")
             else:
                 print("⚠️  WARNING: Response doesn't contain expected property data")
         
     except Exception as e:
-        print(f"❌ Error during real property test: {e}")
+        logger.exception("❌ Error during real property test: %s", e)
+    
+    return False
 
 async def main():
     """Run all tests"""
-    await test_swarm_with_mock_property()
-    await test_swarm_with_real_property()
+    # One orchestrator (one compiled graph) shared by both independent tests
+    orchestrator = SwarmOrchestrator()
+    await asyncio.gather(
+        check_swarm_with_mock_property(orchestrator),
+        check_swarm_with_real_property(orchestrator)
+    )
     print("\n" + "="*60)
     print("🏁 All tests completed!")
     print("✅ SwarmOrchestrator is now using property_context correctly!")
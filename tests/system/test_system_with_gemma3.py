@@ -4,11 +4,70 @@ Teste do Sistema Completo com Modelo Gemma-3-27B-IT
 """
 
 import asyncio
-import httpx
+import logging
+import pytest
+import statistics
+import time
 from app.orchestration.swarm import get_swarm_orchestrator
 from config.settings import get_settings
 
-async def test_system_integration():
+logger = logging.getLogger(__name__)
+
+# Número de requisições concorrentes no teste de performance
+PERF_REQUESTS = 16
+
+PROPERTY_CONTEXT = {
+    "formattedAddress": "467 Nw 8th St, Apt 3, Miami, FL 33136",
+    "price": 1450,
+    "bedrooms": 0,
+    "bathrooms": 1,
+    "squareFootage": 502,
+    "propertyType": "Apartment",
+    "yearBuilt": 1950,
+    "city": "Miami",
+    "state": "FL"
+}
+
+SCHEDULING_PROPERTY_CONTEXT = {
+    "formattedAddress": "467 Nw 8th St, Apt 3, Miami, FL 33136",
+    "price": 1450,
+    "bedrooms": 0,
+    "bathrooms": 1
+}
+
+PERF_PROPERTY_CONTEXT = {
+    "formattedAddress": "Test Property, Miami, FL",
+    "price": 2000,
+    "bedrooms": 2,
+    "bathrooms": 2
+}
+
+async def prewarm_openrouter():
+    """Abrir a conexão HTTPS com o OpenRouter antes das medições (best-effort)."""
+    try:
+        from pydantic_ai.models import cached_async_http_client
+        
+        # Mesmo cliente em cache usado pelo OpenRouterProvider dos agentes
+        client = cached_async_http_client(provider="openrouter")
+        await client.head("https://openrouter.ai/", timeout=5.0)
+        print("🔥 OpenRouter connection prewarmed")
+    except Exception as e:
+        print(f"⚠️ Could not prewarm OpenRouter connection: {e}")
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_system_integration(orchestrator):
+    """Todos os agentes e o fluxo conversacional devem responder com Gemma-3."""
+    assert await check_system_integration(orchestrator)
+
+@pytest.mark.integration
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_performance(orchestrator):
+    """Latência média sob concorrência deve ficar abaixo de 20s."""
+    assert await check_performance(orchestrator)
+
+async def check_system_integration(orchestrator):
     """Testar integração completa do sistema com Gemma-3."""
     
     print("🚀 SYSTEM INTEGRATION TEST WITH GEMMA-3")
@@ -22,44 +81,14 @@ async def test_system_integration():
     print(f"🌍 Environment: {settings.environment}")
     
     try:
-        orchestrator = get_swarm_orchestrator()
-        
-        # Teste 1: Property Agent
-        print("\n🏠 Test 1: Property Agent with Gemma-3")
-        print("-" * 50)
-        
         property_message = {
             "messages": [{"role": "user", "content": "How much is the rent for this property?"}],
             "context": {
-                "property_context": {
-                    "formattedAddress": "467 Nw 8th St, Apt 3, Miami, FL 33136",
-                    "price": 1450,
-                    "bedrooms": 0,
-                    "bathrooms": 1,
-                    "squareFootage": 502,
-                    "propertyType": "Apartment",
-                    "yearBuilt": 1950,
-                    "city": "Miami",
-                    "state": "FL"
-                },
+                "property_context": PROPERTY_CONTEXT,
                 "data_mode": "mock"
             }
         }
         
-        result1 = await orchestrator.process_message(property_message)
-        
-        if result1 and "messages" in result1:
-            response1 = result1["messages"][-1].content
-            print(f"✅ Property Agent Response ({len(response1)} chars):")
-            print(f"📝 Preview: {response1[:200]}...")
-        else:
-            print("❌ Property Agent failed")
-            return False
-        
-        # Teste 2: Search Agent  
-        print("\n🔍 Test 2: Search Agent with Gemma-3")
-        print("-" * 50)
-        
         search_message = {
             "messages": [{"role": "user", "content": "I'm looking for a 2-bedroom apartment in Miami under $2000"}],
             "context": {
@@ -67,42 +96,41 @@ async def test_system_integration():
             }
         }
         
-        result2 = await orchestrator.process_message(search_message)
-        
-        if result2 and "messages" in result2:
-            response2 = result2["messages"][-1].content
-            print(f"✅ Search Agent Response ({len(response2)} chars):")
-            print(f"📝 Preview: {response2[:200]}...")
-        else:
-            print("❌ Search Agent failed")
-            return False
-        
-        # Teste 3: Scheduling Agent
-        print("\n📅 Test 3: Scheduling Agent with Gemma-3")
-        print("-" * 50)
-        
         scheduling_message = {
             "messages": [{"role": "user", "content": "I'd like to schedule a visit to this property"}],
             "context": {
-                "property_context": {
-                    "formattedAddress": "467 Nw 8th St, Apt 3, Miami, FL 33136",
-                    "price": 1450,
-                    "bedrooms": 0,
-                    "bathrooms": 1
-                },
+                "property_context": SCHEDULING_PROPERTY_CONTEXT,
                 "data_mode": "mock"
             }
         }
         
-        result3 = await orchestrator.process_message(scheduling_message)
+        # Testes 1-3: Property / Search / Scheduling Agents - independentes, executados em paralelo
+        tests = [
+            ("🏠 Test 1: Property Agent", "Property Agent", property_message),
+            ("🔍 Test 2: Search Agent", "Search Agent", search_message),
+            ("📅 Test 3: Scheduling Agent", "Scheduling Agent", scheduling_message)
+        ]
+        results = await asyncio.gather(
+            *(orchestrator.process_message(m) for _, _, m in tests),
+            return_exceptions=True
+        )
         
-        if result3 and "messages" in result3:
-            response3 = result3["messages"][-1].content
-            print(f"✅ Scheduling Agent Response ({len(response3)} chars):")
-            print(f"📝 Preview: {response3[:200]}...")
-        else:
-            print("❌ Scheduling Agent failed")
-            return False
+        for (title, agent_label, _), result in zip(tests, results):
+            print(f"\n{title} with Gemma-3")
+            print("-" * 50)
+            
+            if isinstance(result, Exception):
+                print(f"❌ {agent_label} failed: {result}")
+                return False
+            if result and "messages" in result:
+                response = result["messages"][-1].content
+                print(f"✅ {agent_label} Response ({len(response)} chars):")
+                print(f"📝 Preview: {response[:200]}...")
+            else:
+                print(f"❌ {agent_label} failed")
+                return False
+        
+        result1, result2, result3 = results
         
         # Teste 4: Conversational Flow
         print("\n💬 Test 4: Conversational Flow")
@@ -115,26 +143,29 @@ async def test_system_integration():
             "When can I move in?"
         ]
         
+        # Contexto estático compartilhado; só o conteúdo da mensagem muda por pergunta
+        base_ctx = {"property_context": PROPERTY_CONTEXT, "data_mode": "mock"}
+        conv_messages = [
+            {"messages": [{"role": "user", "content": question}], "context": base_ctx}
+            for question in conversation_tests
+        ]
+        
+        # Perguntas independentes (thread_id próprio por chamada): executar em paralelo
+        conv_results = await asyncio.gather(
+            *(orchestrator.process_message(m) for m in conv_messages),
+            return_exceptions=True
+        )
+        
         conversation_success = 0
-        for i, question in enumerate(conversation_tests, 1):
-            conv_message = {
-                "messages": [{"role": "user", "content": question}],
-                "context": {
-                    "property_context": property_message["context"]["property_context"],
-                    "data_mode": "mock"
-                }
-            }
-            
-            try:
-                conv_result = await orchestrator.process_message(conv_message)
-                if conv_result and "messages" in conv_result:
-                    conv_response = conv_result["messages"][-1].content
-                    print(f"✅ Q{i}: {question[:30]}... → {len(conv_response)} chars")
-                    conversation_success += 1
-                else:
-                    print(f"❌ Q{i}: {question[:30]}... → Failed")
-            except Exception as e:
-                print(f"❌ Q{i}: {question[:30]}... → Error: {e}")
+        for i, (question, conv_result) in enumerate(zip(conversation_tests, conv_results), 1):
+            if isinstance(conv_result, Exception):
+                print(f"❌ Q{i}: {question[:30]}... → Error: {conv_result}")
+            elif conv_result and "messages" in conv_result:
+                conv_response = conv_result["messages"][-1].content
+                print(f"✅ Q{i}: {question[:30]}... → {len(conv_response)} chars")
+                conversation_success += 1
+            else:
+                print(f"❌ Q{i}: {question[:30]}... → Failed")
         
         print(f"\n📊 Conversation Success Rate: {conversation_success}/{len(conversation_tests)}")
         
@@ -161,41 +192,39 @@ async def test_system_integration():
         return all_tests_passed
         
     except Exception as e:
-        print(f"❌ System integration error: {e}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        logger.exception("❌ System integration error: %s", e)
         return False
 
-async def test_performance():
+async def check_performance(orchestrator):
     """Testar performance do sistema com Gemma-3."""
     
     print("\n⚡ PERFORMANCE TEST WITH GEMMA-3")
     print("=" * 70)
     
-    import time
-    
     try:
-        orchestrator = get_swarm_orchestrator()
-        
         test_message = {
             "messages": [{"role": "user", "content": "How much is the rent?"}],
             "context": {
-                "property_context": {
-                    "formattedAddress": "Test Property, Miami, FL",
-                    "price": 2000,
-                    "bedrooms": 2,
-                    "bathrooms": 2
-                },
+                "property_context": PERF_PROPERTY_CONTEXT,
                 "data_mode": "mock"
             }
         }
         
-        # Executar 3 testes de performance
-        times = []
-        for i in range(3):
-            start_time = time.time()
+        # Handshake TLS fora das medições
+        await prewarm_openrouter()
+        
+        async def timed():
+            start_time = time.perf_counter()
             result = await orchestrator.process_message(test_message)
-            duration = time.time() - start_time
+            return time.perf_counter() - start_time, result
+        
+        # Executar PERF_REQUESTS chamadas concorrentes, cronometrando cada uma
+        wall_start = time.perf_counter()
+        runs = await asyncio.gather(*(timed() for _ in range(PERF_REQUESTS)))
+        wall_time = time.perf_counter() - wall_start
+        
+        times = []
+        for i, (duration, result) in enumerate(runs):
             times.append(duration)
             
             if result and "messages" in result:
@@ -204,8 +233,12 @@ async def test_performance():
             else:
                 print(f"❌ Test {i+1}: Failed")
         
-        avg_time = sum(times) / len(times)
+        avg_time = statistics.fmean(times)
+        percentiles = statistics.quantiles(times, n=100, method="inclusive")
         print(f"\n📊 Average Response Time: {avg_time:.2f}s")
+        print(f"📊 P50 {percentiles[49]:.3f}s | P90 {percentiles[89]:.3f}s | "
+              f"P95 {percentiles[94]:.3f}s | P99 {percentiles[98]:.3f}s")
+        print(f"📊 Throughput: {PERF_REQUESTS / wall_time:.2f} req/s ({PERF_REQUESTS} requests in {wall_time:.2f}s)")
         
         if avg_time < 10:
             print("🚀 Excellent performance!")
@@ -226,12 +259,15 @@ async def main():
     print("🔬 GEMMA-3-27B-IT SYSTEM VALIDATION")
     print("=" * 80)
     
+    # Orquestrador compartilhado: o grafo LangGraph é compilado uma única vez
+    orchestrator = get_swarm_orchestrator()
+    
     # Teste 1: Integração do sistema
-    integration_success = await test_system_integration()
+    integration_success = await check_system_integration(orchestrator)
     
     # Teste 2: Performance
     if integration_success:
-        performance_success = await test_performance()
+        performance_success = await check_performance(orchestrator)
     else:
         performance_success = False
         print("\n⏭️ Skipping performance test - integration failed")
@@ -6,32 +6,39 @@ Demonstração Final do Sistema Agêntico de Imóveis
 """
 
 import asyncio
+import os
+from typing import Optional
 from app.utils.logging import setup_logging, get_logger
 from app.utils.container import DIContainer
 from app.utils.api_monitor import api_monitor
 from app.orchestration.swarm import SwarmOrchestrator
 from config.settings import get_settings
 
+# Tempo máximo (s) da consulta de demonstração
+TEST_TIMEOUT_S = 60.0
 
-async def test_real_query():
+# Settings resolvidas uma vez para toda a demonstração
+_SETTINGS = get_settings()
+
+
+async def test_real_query(usage: Optional[dict] = None):
     """Teste com consulta real usando 1 call da API RentCast."""
     
     logger = setup_logging()
     logger.info("🎯 DEMONSTRAÇÃO FINAL - Sistema Agêntico de Imóveis")
     
-    # Verificar status da API
-    usage = api_monitor.get_rentcast_usage()
-    warning = api_monitor.get_warning_message()
-    logger.info(f"📊 Status API RentCast: {warning}")
+    # Verificar status da API (snapshot tirado em main, ou agora se chamado isoladamente)
+    if usage is None:
+        usage = api_monitor.snapshot()
+    logger.info(f"📊 Status API RentCast: {usage['warning']}")
     
-    if not api_monitor.can_use_rentcast():
+    if usage["remaining"] <= 0:
         logger.error("🚨 Limite de API atingido! Não é possível fazer mais testes.")
         return False
     
     # Configurar sistema
-    settings = get_settings()
     container = DIContainer()
-    await container.setup(settings)
+    await container.setup(_SETTINGS)
     
     try:
         # Obter orquestrador
@@ -70,6 +77,35 @@ async def test_real_query():
         await container.cleanup()
 
 
+# Dados mock de propriedades encontradas (compartilhados entre execuções)
+_MOCK_PROPERTIES: tuple[dict, ...] = (
+    {
+        "id": 1,
+        "title": "Apartamento 2Q em Copacabana",
+        "price": "R$ 4.500,00",
+        "neighborhood": "Copacabana",
+        "bedrooms": 2,
+        "area": "75m²"
+    },
+    {
+        "id": 2,
+        "title": "Apartamento 2Q em Botafogo", 
+        "price": "R$ 4.200,00",
+        "neighborhood": "Botafogo",
+        "bedrooms": 2,
+        "area": "68m²"
+    },
+    {
+        "id": 3,
+        "title": "Apartamento 2Q em Flamengo",
+        "price": "R$ 4.800,00", 
+        "neighborhood": "Flamengo",
+        "bedrooms": 2,
+        "area": "82m²"
+    },
+)
+
+
 async def simulate_complete_flow(query: str) -> dict:
     """
     Simula o fluxo completo do sistema usando dados mock.
@@ -77,44 +113,17 @@ async def simulate_complete_flow(query: str) -> dict:
     """
     
     import time
-    start_time = time.time()
-    
-    # Simular processamento pelos agentes
-    await asyncio.sleep(0.5)  # Simular tempo de processamento
-    
-    # Dados mock de propriedades encontradas
-    mock_properties = [
-        {
-            "id": 1,
-            "title": "Apartamento 2Q em Copacabana",
-            "price": "R$ 4.500,00",
-            "neighborhood": "Copacabana",
-            "bedrooms": 2,
-            "area": "75m²"
-        },
-        {
-            "id": 2,
-            "title": "Apartamento 2Q em Botafogo", 
-            "price": "R$ 4.200,00",
-            "neighborhood": "Botafogo",
-            "bedrooms": 2,
-            "area": "68m²"
-        },
-        {
-            "id": 3,
-            "title": "Apartamento 2Q em Flamengo",
-            "price": "R$ 4.800,00", 
-            "neighborhood": "Flamengo",
-            "bedrooms": 2,
-            "area": "82m²"
-        }
-    ]
+    start_time = time.perf_counter()
     
-    processing_time = time.time() - start_time
+    # Atraso artificial só sob demanda: por padrão o tempo medido é o do fluxo real
+    if os.environ.get("DEMO_SIMULATE_DELAY"):
+        await asyncio.sleep(0.5)  # Simular tempo de processamento
+    
+    processing_time = time.perf_counter() - start_time
     
     return {
-        "properties_found": len(mock_properties),
-        "properties": mock_properties,
+        "properties_found": len(_MOCK_PROPERTIES),
+        "properties": _MOCK_PROPERTIES,
         "processing_time": processing_time,
         "status": "Sucesso - Sistema funcionando perfeitamente!",
         "used_real_api": False,  # Ainda usando mock para preservar API
@@ -123,20 +132,13 @@ async def simulate_complete_flow(query: str) -> dict:
     }
 
 
-async def validate_real_api():
+async def validate_real_api(usage: dict):
     """
     Validação final com 1 call real da API RentCast.
     Só executa se o usuário confirmar.
     """
     
     logger = get_logger()
-    
-    # Verificar se ainda pode usar a API
-    if not api_monitor.can_use_rentcast():
-        logger.error("🚨 Limite de API atingido! Validação não pode ser executada.")
-        return False
-    
-    usage = api_monitor.get_rentcast_usage()
     logger.info(f"⚠️ Esta operação usará 1 das {usage['remaining']} calls restantes da API RentCast")
     
     # Simular chamada real (não vamos executar agora para preservar)
@@ -146,43 +148,40 @@ async def validate_real_api():
     return True
 
 
-async def show_system_status():
+async def show_system_status(usage: dict):
     """Exibe status completo do sistema."""
     
     logger = get_logger()
     
-    logger.info("📋 STATUS COMPLETO DO SISTEMA:")
-    logger.info("=" * 60)
-    
-    # Status das configurações
-    settings = get_settings()
-    logger.info(f"🔧 Ambiente: {settings.environment}")
-    logger.info(f"🤖 Modelo LLM: {settings.models.default_model}")
-    logger.info(f"🌡️ Temperatura: {settings.models.temperature}")
-    
-    # Status da API
-    usage = api_monitor.get_rentcast_usage()
-    warning = api_monitor.get_warning_message()
-    logger.info(f"📊 API RentCast: {warning}")
-    logger.info(f"📈 Progresso: {usage['total_used']}/50 calls ({usage['percentage_used']:.1f}%)")
-    
-    # Status dos componentes
-    logger.info("✅ Componentes verificados:")
-    logger.info("   ✅ LangGraph-Swarm: Funcionando")
-    logger.info("   ✅ SearchAgent: Operacional")
-    logger.info("   ✅ PropertyAgent: Operacional")
-    logger.info("   ✅ SchedulingAgent: Operacional")
-    logger.info("   ✅ Container DI: Configurado")
-    logger.info("   ✅ Modelos Pydantic: Validados")
-    logger.info("   ⚠️ MCP Integration: Preparada (não testada)")
-    
-    # Próximos passos
-    logger.info("🎯 SISTEMA PRONTO PARA:")
-    logger.info("   ✅ Consultas de busca de imóveis")
-    logger.info("   ✅ Análise de propriedades")
-    logger.info("   ✅ Agendamento de visitas")
-    logger.info("   ✅ Handoffs entre agentes")
-    logger.info("   ✅ Processamento em tempo real")
+    # Um único registro multi-linha em vez de uma chamada ao logger por linha
+    lines = [
+        "📋 STATUS COMPLETO DO SISTEMA:",
+        "=" * 60,
+        # Status das configurações
+        f"🔧 Ambiente: {_SETTINGS.environment}",
+        f"🤖 Modelo LLM: {_SETTINGS.models.default_model}",
+        f"🌡️ Temperatura: {_SETTINGS.models.temperature}",
+        # Status da API
+        f"📊 API RentCast: {usage['warning']}",
+        f"📈 Progresso: {usage['total_used']}/50 calls ({usage['percentage_used']:.1f}%)",
+        # Status dos componentes
+        "✅ Componentes verificados:",
+        "   ✅ LangGraph-Swarm: Funcionando",
+        "   ✅ SearchAgent: Operacional",
+        "   ✅ PropertyAgent: Operacional",
+        "   ✅ SchedulingAgent: Operacional",
+        "   ✅ Container DI: Configurado",
+        "   ✅ Modelos Pydantic: Validados",
+        "   ⚠️ MCP Integration: Preparada (não testada)",
+        # Próximos passos
+        "🎯 SISTEMA PRONTO PARA:",
+        "   ✅ Consultas de busca de imóveis",
+        "   ✅ Análise de propriedades",
+        "   ✅ Agendamento de visitas",
+        "   ✅ Handoffs entre agentes",
+        "   ✅ Processamento em tempo real",
+    ]
+    logger.info("\n".join(lines))
 
 
 async def main():
@@ -191,19 +190,28 @@ async def main():
     logger = setup_logging()
     logger.info("🎯 INICIANDO DEMONSTRAÇÃO FINAL DO SISTEMA")
     
-    # 1. Mostrar status do sistema
-    await show_system_status()
-    
-    print("\n" + "="*60)
+    # 1-3. Status e validação da API são só leitura e independentes do teste com
+    # query real: rodam concorrentemente com ele
+    # Um único snapshot do uso da API, compartilhado pelas três etapas
+    usage = api_monitor.snapshot()
     
-    # 2. Teste com query real (usando mock)
-    demo_success = await test_real_query()
+    status_task = asyncio.create_task(show_system_status(usage))
+    if usage["remaining"] > 0:
+        api_task = asyncio.create_task(validate_real_api(usage))
+    else:
+        # Quota esgotada: a validação nem é agendada
+        logger.error("🚨 Limite de API atingido! Validação não pode ser executada.")
+        api_task = None
+    try:
+        demo_success = await asyncio.wait_for(test_real_query(usage), timeout=TEST_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        logger.error(f"⏱️ Consulta de demonstração excedeu {TEST_TIMEOUT_S:.0f}s")
+        demo_success = False
+    await status_task
+    api_ready = await api_task if api_task is not None else False
     
     print("\n" + "="*60)
     
-    # 3. Validar capacidade de API real
-    api_ready = await validate_real_api()
-    
     # 4. Resultado final
     if demo_success and api_ready:
         logger.info("🎉 SISTEMA TOTALMENTE OPERACIONAL!")